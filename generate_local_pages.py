@@ -42,11 +42,14 @@ import shutil
 import sys
 import urllib.parse
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
 
 import markets  # noqa: E402
+import salon_changes  # noqa: E402
+import salon_hours  # noqa: E402
 
 SITE_URL = "https://greatclipsdeal.com"
 REPO_ROOT = Path(__file__).resolve().parent
@@ -99,28 +102,6 @@ def tel_href(phone: str) -> str:
     return f"tel:+1{digits}" if len(digits) == 10 else f"tel:{digits}"
 
 
-def to_24h(label: str) -> str | None:
-    """'8:30 AM' -> '08:30' for schema.org openingHoursSpecification."""
-    label = label.strip()
-    if not label:
-        return None
-    suffix = label[-2:].upper()
-    if suffix not in ("AM", "PM"):
-        return None
-    clock = label[:-2].strip()
-    hour, _, minute = clock.partition(":")
-    try:
-        hour_i = int(hour)
-    except ValueError:
-        return None
-    minute_i = int(minute) if minute.isdigit() else 0
-    if suffix == "PM" and hour_i != 12:
-        hour_i += 12
-    if suffix == "AM" and hour_i == 12:
-        hour_i = 0
-    return f"{hour_i:02d}:{minute_i:02d}"
-
-
 # ------------------------------------------------------------ static assets --
 
 # Shipped once to docs/assets/city-coupons.js rather than inlined into every page:
@@ -421,12 +402,28 @@ def head_html(title: str, description: str, canonical: str, extra: str = "") ->
 
 def hours_summary(salon: dict) -> str:
     """Collapse a week of hours into as few lines as possible."""
+    week = salon_hours.week_for(salon)
+    if week is not None:
+        return _week_summary(week)
     hours = salon.get("hours") or {}
     if not hours:
         return ""
+    return _label_summary(tuple(hours.get(day, "Closed") for day in DAYS))
+
+
+@lru_cache(maxsize=None)
+def _week_summary(week: tuple) -> str:
+    labels = ["Closed"] * 7
+    for day, opens, closes in salon_hours.day_ranges(week):
+        labels[DAYS.index(day)] = f"{salon_hours.format_time(opens)} - {salon_hours.format_time(closes)}"
+    return _label_summary(tuple(labels))
+
+
+@lru_cache(maxsize=None)
+def _label_summary(labels: tuple[str, ...]) -> str:
+    """labels: what each day of DAYS shows, Monday first."""
     runs: list[tuple[list[str], str]] = []
-    for day in DAYS:
-        value = hours.get(day, "Closed")
+    for day, value in zip(DAYS, labels):
         if runs and runs[-1][1] == value:
             runs[-1][0].append(day)
         else:
@@ -563,21 +560,19 @@ def salon_schema(salon: dict, city: dict) -> dict:
             "latitude": salon["lat"],
             "longitude": salon["lng"],
         }
-    spec = []
-    for day, value in (salon.get("hours") or {}).items():
-        if "-" not in value:
-            continue
-        opens, _, closes = value.partition("-")
-        o, c = to_24h(opens), to_24h(closes)
-        if o and c and day in SCHEMA_DAY:
-            spec.append(
-                {
-                    "@type": "OpeningHoursSpecification",
-                    "dayOfWeek": SCHEMA_DAY[day],
-                    "opens": o,
-                    "closes": c,
-                }
-            )
+    week = salon_hours.week_for(salon)
+    if week is None and salon.get("hours"):
+        # Some day will not parse; list the days that do
+        week = salon_hours.week_from_labels(salon["hours"], partial=True)
+    spec = [
+        {
+            "@type": "OpeningHoursSpecification",
+            "dayOfWeek": SCHEMA_DAY[day],
+            "opens": salon_hours.hhmm(opens),
+            "closes": salon_hours.hhmm(closes),
+        }
+        for day, opens, closes in (salon_hours.day_ranges(week) if week else ())
+    ]
     if spec:
         node["openingHoursSpecification"] = spec
     return node
@@ -690,7 +685,7 @@ def build_city_page(
     plural = "salon" if count == 1 else "salons"
 
     price_sentence, price_badge = price_line(state, stats)
-    nearby = markets.nearest_cities(city, cities, limit=10, max_mi=40.0)
+    nearby = markets.nearest_cities(city, cities, limit=10, max_mi=markets.CITY_PAGE_NEARBY_MI)
     streets = [s["street"] for s in city["salons"]]
 
     title = (
@@ -1042,6 +1037,11 @@ def main() -> int:
         action="store_true",
         help="remove docs/salons first (drops pages for closed salons)",
     )
+    ap.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="only rebuild cities (their metros and nearby cities) in data/salon_changes.json",
+    )
     args = ap.parse_args()
 
     cities, metros = markets.build_all()
@@ -1052,8 +1052,28 @@ def main() -> int:
     targets = sorted(cities.values(), key=lambda c: (c["state"], c["slug"]))
     if args.state:
         targets = [c for c in targets if c["state"] == args.state.upper()]
+    removed_pages: list[str] = []
+    if args.changed_only:
+        changes = salon_changes.load_changes()
+        if changes is None:
+            print("No data/salon_changes.json - building every city.")
+        else:
+            touched = set(changes.get("city_keys", []))
+            # Pages whose nearby-cities list shows a touched city go too
+            touched.update(changes.get("nearby_keys", []))
+            # Metro peers list each other's salon counts, so they go too, as do
+            # metros whose name or member cities changed
+            touched_metros = {cities[k]["metro_key"] for k in changes.get("city_keys", []) if k in cities}
+            touched_metros.update(changes.get("metro_keys", []))
+            targets = [c for c in targets if c["key"] in touched or c["metro_key"] in touched_metros]
+            removed_pages = changes.get("removed_pages", [])
+            print(f"Changed since the last fetch: {salon_changes.summary(changes)}")
     if args.limit:
         targets = targets[: args.limit]
+        removed_pages = []  # a partial build deletes nothing
+    if args.state:
+        prefix = f"salons/{args.state.lower()}/"
+        removed_pages = [p for p in removed_pages if p.startswith(prefix)]
 
     if args.clean and OUT_DIR.exists() and not args.dry_run:
         shutil.rmtree(OUT_DIR)
@@ -1065,6 +1085,12 @@ def main() -> int:
         print("  (dry run, nothing written)")
         return 0
 
+    for page_path in removed_pages:
+        stale = OUT_DIR.parent / page_path
+        if stale.exists():
+            stale.unlink()
+            print(f"  removed {page_path}")
+
     written = 0
     total_bytes = 0
     for city in targets:
@@ -13,7 +13,8 @@ CURRENT_MONTH = NOW.strftime("%B")
 CURRENT_DATE = NOW.strftime("%Y-%m-%d")
 
 # Historical per-state stats computed from our coupon-tracking dataset
-# (see data/state_history_stats.json; regenerate when refreshing the studies).
+# (see data/state_history_stats.json; regenerate from data/history/ with
+# `python scripts/coupon_history.py stats --since <date> --write`).
 STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "state_history_stats.json")
 try:
     with open(STATS_FILE, encoding="utf-8") as _f:
@@ -725,7 +725,7 @@ def expand_area_coupons(coupons):
         return []
 
     try:
-        cities, _metros = markets.build_all()
+        cities, _metros = markets.build_all(columns=("zip",))
     except SystemExit as exc:  # data/salons.json absent
         print(f"   Skipping area expansion ({exc})")
         return []
@@ -0,0 +1,283 @@
+"""
+Groq LLM classification of coupon validity text, shared by scraper.py and
+reverify_us_coupons.py.
+
+Needs GROQ_API_KEY (free at console.groq.com) for anything not cached yet.
+Only pages the regex rules in offer_rules.py cannot place reach the LLM. Their
+validity snippets are:
+
+- looked up first in data/llm_classifications.json, keyed by a hash of the
+  normalized snippet, so a coupon classified once is never sent again - not on
+  the next scrape and not by the re-verify script;
+- sent in batches of up to LLM_BATCH_SIZE snippets per request, with at most
+  LLM_CONCURRENCY requests in flight;
+- retried with exponential backoff on 429 / 5xx / connection errors, honoring
+  Retry-After.
+
+The HTTP call goes through a transport function, default requests.post, which
+can be swapped for a fake (classify_many(..., transport=fake)). GROQ_API_URL
+points the default transport at a local stand-in server instead of Groq.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+import offer_rules
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+import atomic_write  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GROQ_API_URL = os.environ.get('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
+GROQ_MODEL = os.environ.get('GROQ_MODEL', 'llama-3.1-8b-instant')
+LLM_BATCH_SIZE = int(os.environ.get('GC_LLM_BATCH_SIZE', '10'))
+LLM_CONCURRENCY = int(os.environ.get('GC_LLM_CONCURRENCY', '2'))
+LLM_MAX_RETRIES = 4
+LLM_TIMEOUT = 15
+
+# Classification results, persisted between runs. Bump LLM_CACHE_VERSION whenever
+# the prompt changes what a snippet classifies as. Failed calls are never cached;
+# entries unused for LLM_CACHE_MAX_AGE_DAYS are dropped on save. last_used only
+# records the week (its Monday), so cache hits rewrite the committed file at
+# most once a week.
+LLM_CACHE_FILE = os.path.join(DATA_DIR, "llm_classifications.json")
+LLM_CACHE_VERSION = 1
+LLM_CACHE_MAX_AGE_DAYS = 90
+_LLM_CACHE = None
+_LLM_CACHE_DIRTY = False
+_LLM_CACHE_LOCK = threading.Lock()
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_PROMPT = (
+    'Classify each Great Clips coupon validity text below. '
+    'Return ONLY a JSON object {"results": [...]} with one entry per text, each with these exact fields:\n'
+    '- "id": the number of the text\n'
+    '- "type": "US" (valid anywhere in the US), "AREA" (valid only in a specific city/region), '
+    'or "LOCATION" (valid at one specific salon address)\n'
+    '- "area_name": the region description if AREA (e.g. "OKC area and N. Central & W OK area"), else null\n'
+    '- "location_name": the salon name if LOCATION, else null\n'
+    '- "city": the city if LOCATION, else null\n'
+    '- "state": 2-letter state code if LOCATION, else null\n'
+    '- "expiration": date as MM/DD/YYYY if found, else null\n\n'
+    '{texts}\n\n'
+    'JSON only, no explanation.'
+)
+
+
+def snippet_key(snippet):
+    """Cache key for a validity snippet: case and whitespace do not matter."""
+    normalized = _WHITESPACE_RE.sub(' ', snippet).strip().casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _llm_cache():
+    """Load data/llm_classifications.json on first use."""
+    global _LLM_CACHE
+    if _LLM_CACHE is None:
+        _LLM_CACHE = {}
+        if os.path.exists(LLM_CACHE_FILE):
+            try:
+                with open(LLM_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == LLM_CACHE_VERSION:
+                    _LLM_CACHE = data.get("snippets", {})
+            except Exception as e:
+                print(f"   ⚠️ Could not load LLM cache: {e}")
+    return _LLM_CACHE
+
+
+def save_llm_cache():
+    """Write the classification cache back to data/, if anything changed."""
+    global _LLM_CACHE_DIRTY
+    if not _LLM_CACHE_DIRTY:
+        return
+
+    cutoff = (datetime.now() - timedelta(days=LLM_CACHE_MAX_AGE_DAYS)).strftime('%Y-%m-%d')
+    snippets = {
+        key: entry
+        for key, entry in sorted(_llm_cache().items())
+        if entry.get("last_used", "") >= cutoff
+    }
+    atomic_write.write_json(
+        LLM_CACHE_FILE, {"version": LLM_CACHE_VERSION, "snippets": snippets}, indent=1, ensure_ascii=False
+    )
+    _LLM_CACHE_DIRTY = False
+
+
+def requests_transport(url, headers, payload, timeout):
+    """POST `payload` as JSON. Returns (status, retry_after, body_text)."""
+    resp = requests.post(url, headers=headers, json=payload, timeout=timeout)
+    return resp.status_code, resp.headers.get('Retry-After'), resp.text
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry `attempt` (1-based): Retry-After, else 1, 2, 4 ... plus jitter."""
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), 60.0)
+    except ValueError:
+        pass
+    return min(2 ** (attempt - 1), 30) + random.uniform(0, 0.5)
+
+
+def _request_batch(snippets, api_key, transport, limiter):
+    """
+    Classify one batch. Returns a list of result dicts (or None where the model
+    gave nothing usable), aligned with `snippets`. Never raises.
+    """
+    texts = "\n".join(f'{i}. "{snippet}"' for i, snippet in enumerate(snippets, 1))
+    payload = {
+        'model': GROQ_MODEL,
+        'messages': [{'role': 'user', 'content': _PROMPT.replace('{texts}', texts)}],
+        'temperature': 0,
+        'max_tokens': 60 + 140 * len(snippets),
+        'response_format': {'type': 'json_object'},
+    }
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json',
+    }
+
+    for attempt in range(1, LLM_MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            with limiter:
+                status, retry_after, body = transport(GROQ_API_URL, headers, payload, LLM_TIMEOUT)
+            if status in _RETRY_STATUSES:
+                raise RuntimeError(f"HTTP {status}")
+            if status >= 400:
+                print(f'   ⚠️  Groq LLM error: HTTP {status}')
+                return [None] * len(snippets)
+            content = json.loads(body)['choices'][0]['message']['content']
+            results = json.loads(content)
+        except Exception as e:
+            if attempt == LLM_MAX_RETRIES:
+                print(f'   ⚠️  Groq LLM error: {e}')
+                return [None] * len(snippets)
+            time.sleep(_backoff_delay(attempt, retry_after))
+            continue
+
+        # A one-snippet batch may come back as a bare object
+        items = results.get("results") if isinstance(results, dict) else None
+        if items is None and isinstance(results, dict) and "type" in results:
+            items = [{**results, "id": 1}]
+        by_id = {}
+        for item in items or []:
+            try:
+                by_id[int(item.get("id"))] = item
+            except (AttributeError, TypeError, ValueError):
+                continue
+        return [by_id.get(i) for i in range(1, len(snippets) + 1)]
+
+    return [None] * len(snippets)
+
+
+def classify_many(page_texts, transport=None, api_key=None):
+    """
+    Classify the validity text of many offer pages with as few LLM calls as possible.
+
+    Returns one result per page, in order: a dict with keys type, area_name,
+    location_name, city, state, expiration (type is 'US', 'AREA', 'LOCATION'
+    or 'UNKNOWN'), or None when the LLM is unavailable or failed.
+    """
+    global _LLM_CACHE_DIRTY
+    snippets = [offer_rules.llm_snippet(text) for text in page_texts]
+    if not snippets:
+        return []
+
+    api_key = api_key or os.environ.get('GROQ_API_KEY')
+    if transport is None:
+        transport = requests_transport if requests else None
+
+    cache = _llm_cache()
+    now = datetime.now()
+    this_week = (now - timedelta(days=now.weekday())).strftime('%Y-%m-%d')
+    keys = [snippet_key(s) for s in snippets]
+    pending = {}  # key -> snippet, first occurrence wins
+    with _LLM_CACHE_LOCK:
+        for key, snippet in zip(keys, snippets):
+            entry = cache.get(key)
+            if entry is None:
+                pending.setdefault(key, snippet)
+            elif entry.get("last_used", "") < this_week:
+                entry["last_used"] = this_week
+                _LLM_CACHE_DIRTY = True
+
+    hits = len(snippets) - sum(1 for key in keys if key in pending)
+    if hits:
+        print(f"   ♻️  {hits} of {len(snippets)} snippet(s) already classified (LLM cache)")
+
+    if pending and api_key and transport:
+        pending_keys = list(pending)
+        batch_size = max(1, LLM_BATCH_SIZE)
+        batches = [pending_keys[i:i + batch_size] for i in range(0, len(pending_keys), batch_size)]
+        limiter = threading.BoundedSemaphore(max(1, LLM_CONCURRENCY))
+        print(f"   🤖 Classifying {len(pending_keys)} snippet(s) with the LLM in {len(batches)} request(s)...")
+
+        def run(batch):
+            return _request_batch([pending[key] for key in batch], api_key, transport, limiter)
+
+        with ThreadPoolExecutor(max_workers=min(len(batches), max(1, LLM_CONCURRENCY))) as pool:
+            batch_results = list(pool.map(run, batches))
+
+        with _LLM_CACHE_LOCK:
+            for batch, results in zip(batches, batch_results):
+                for key, result in zip(batch, results):
+                    if result:
+                        result = {k: v for k, v in result.items() if k != "id"}
+                        cache[key] = {"snippet": pending[key], "result": result, "last_used": this_week}
+                        _LLM_CACHE_DIRTY = True
+
+    save_llm_cache()
+    results = []
+    for key in keys:
+        entry = cache.get(key)
+        results.append(dict(entry["result"]) if entry else None)
+    return results
+
+
+def classify(page_text, transport=None, api_key=None):
+    """classify_many() for a single page."""
+    return classify_many([page_text], transport=transport, api_key=api_key)[0]
+
+
+def llm_fields(llm):
+    """
+    Turn an LLM result into (type, coupon fields to set). type is 'US', 'AREA',
+    'LOCATION' or 'UNKNOWN'.
+    """
+    ctype = (llm.get("type") or "UNKNOWN").upper()
+    fields = {}
+    if ctype == "US":
+        fields["location_name"] = ""
+        fields["state"] = "US"
+    elif ctype == "AREA":
+        area_name = llm.get("area_name") or "Unknown Area"
+        fields["location_name"] = area_name if "area" in area_name.lower() else f"{area_name} Area"
+        fields["state"] = "AREA"
+        fields["area_name"] = area_name
+        if llm.get("expiration"):
+            fields["expiration"] = llm["expiration"]
+    elif ctype == "LOCATION":
+        for key in ("location_name", "city", "state", "expiration"):
+            if llm.get(key):
+                fields[key] = llm[key]
+    else:
+        ctype = "UNKNOWN"
+        fields["state"] = "UNKNOWN"
+    return ctype, fields
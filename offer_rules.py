@@ -0,0 +1,173 @@
+"""
+Offer-text classification rules, shared by scraper.py and reverify_us_coupons.py.
+
+Every pattern is compiled once at import. classify_offer_text() runs them over
+a page's visible text in one call and reports which rule decided the outcome,
+so the scrape, the purge pass and the re-verify script cannot drift apart, and
+the per-page cost can be measured on its own:
+
+    python scripts/benchmarks.py offer-rules
+"""
+
+import re
+
+# Phrases that indicate an offer page is no longer valid
+ENDED_PHRASES = (
+    "this offer has ended",
+    "we're sorry! this offer has ended",
+    "offer has expired",
+    "this offer is no longer available",
+)
+
+# "Valid at Great Clips <salon> at <street> in <city> <ST>. ... Expires 09/30/2026"
+VALID_AT_RE = re.compile(
+    r'(Valid at Great Clips\s+.+?Expires\s+\d{1,2}/\d{1,2}/\d{4})', re.IGNORECASE | re.DOTALL
+)
+SALON_RE = re.compile(
+    r'Valid (?:at Great Clips|only at)\s+(.+?)\s+at\s+(.+?)\s+in\s+(.+?)\s+([A-Z]{2})[\.\s]'
+)
+VALID_EXPIRES_RE = re.compile(r'Expires\s+(\d{1,2}/\d{1,2}/\d{4})')
+EXPIRES_RE = re.compile(r'Expires?\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})', re.IGNORECASE)
+
+# Explicit US-wide language ("participating US salons", etc.)
+US_WIDE_RE = re.compile(
+    r'(?:participating\s+US|all\s+US|any\s+(?:US\s+)?Great\s+Clips|'
+    r'all\s+Great\s+Clips\s+(?:locations?|salons?)|'
+    r'all\s+participating\s+(?:US\s+)?Great\s+Clips)',
+    re.IGNORECASE,
+)
+# Any "area" language -> definitely NOT US-wide
+AREA_HINT_RE = re.compile(
+    r'\b(?:area|region|metro)\b.{0,60}(?:Great\s+Clips|salons?|locations?)', re.IGNORECASE
+)
+# Narrow area pattern ("participating Toledo area Great Clips")
+AREA_RE = re.compile(
+    r'(?:participating|only at)\s+([A-Za-z\s]+?)\s+area\s+Great\s+Clips', re.IGNORECASE
+)
+# Broader area fallback ("Reno, Carson City & West NV area salons")
+AREA_FALLBACK_RE = re.compile(
+    r'([A-Za-z][\w\s,\.&-]{2,60}?)\s+area\s+(?:Great\s+Clips\s+)?salons?', re.IGNORECASE
+)
+# Words the area fallback can capture that name no place at all
+GENERIC_AREA_WORDS = {'the', 'your', 'local', 'nearby', 'this', 'a', 'an', 'any'}
+
+# Looser validity sentence, kept as valid_text when re-classifying old coupons
+VALID_SNIPPET_RE = re.compile(
+    r'(Valid[\s\S]{0,400}?(?:Expires\s+\d{1,2}/\d{1,2}/\d{4}|salons?\.))', re.IGNORECASE
+)
+# The sentence worth sending to the LLM; keeps token usage minimal
+LLM_SNIPPET_RE = re.compile(
+    r'(Valid[\s\S]{0,400}?(?:salons?|locations?|Expires[^\n]*|\d{1,2}/\d{1,2}/\d{4}))', re.IGNORECASE
+)
+PRICE_RE = re.compile(r'\$(\d+\.?\d{0,2})')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Outcomes of classify_offer_text(), in the order they are tried
+RULE_ENDED = "ended"
+RULE_VALID_TEXT = "valid_text"
+RULE_US_WIDE = "us_wide"
+RULE_AREA = "area"
+RULE_AREA_FALLBACK = "area_fallback"
+RULE_AMBIGUOUS = "ambiguous"  # no clear signal; ask the LLM
+
+
+def _squash(text):
+    return _WHITESPACE_RE.sub(' ', text.strip())
+
+
+def is_ended(page_text):
+    """True if the page says the offer is over."""
+    lowered = page_text.lower()
+    return any(phrase in lowered for phrase in ENDED_PHRASES)
+
+
+def valid_snippet(page_text):
+    """The "Valid ..." sentence, whitespace-normalized, or '' if there is none."""
+    match = VALID_SNIPPET_RE.search(page_text)
+    return _squash(match.group(1)) if match else ''
+
+
+def llm_snippet(page_text):
+    """The validity sentence to classify, falling back to the start of the page."""
+    match = LLM_SNIPPET_RE.search(page_text)
+    return match.group(1).strip() if match else page_text[:500]
+
+
+def extract_price(text):
+    """First dollar amount in the text as "$8.99", or None."""
+    match = PRICE_RE.search(text)
+    return "$" + match.group(1) if match else None
+
+
+def classify_offer_text(page_text):
+    """
+    Run the classification rules over an offer page's visible text, once.
+
+    Returns a dict:
+        rule    which rule decided - ended, valid_text, us_wide, area,
+                area_fallback, or ambiguous (hand the page to the LLM)
+        fields  coupon fields to apply, in the order they should be set
+        fired   every pattern that matched, for diagnostics
+    """
+    if is_ended(page_text):
+        return {"rule": RULE_ENDED, "fields": {}, "fired": [RULE_ENDED]}
+
+    fired = []
+    fields = {}
+
+    valid_match = VALID_AT_RE.search(page_text)
+    if valid_match:
+        fired.append("valid_at")
+        valid_text = _squash(valid_match.group(1))
+        fields["valid_text"] = valid_text
+
+        salon_match = SALON_RE.search(valid_text)
+        if salon_match:
+            fired.append("salon")
+            fields["location_name"] = salon_match.group(1).strip()
+            fields["address"] = salon_match.group(2).strip()
+            fields["city"] = salon_match.group(3).strip()
+            fields["state"] = salon_match.group(4).strip()
+
+        exp_match = VALID_EXPIRES_RE.search(valid_text)
+        if exp_match:
+            fields["expiration"] = exp_match.group(1)
+        return {"rule": RULE_VALID_TEXT, "fields": fields, "fired": fired}
+
+    us_wide_match = US_WIDE_RE.search(page_text)
+    area_hint = AREA_HINT_RE.search(page_text)
+    area_match = AREA_RE.search(page_text)
+    area_fallback = AREA_FALLBACK_RE.search(page_text)
+    exp_match = EXPIRES_RE.search(page_text)
+    for name, match in (
+        ("us_wide", us_wide_match),
+        ("area_hint", area_hint),
+        ("area", area_match),
+        ("area_fallback", area_fallback),
+        ("expires", exp_match),
+    ):
+        if match:
+            fired.append(name)
+
+    # Always keep the expiration, whatever decides the scope
+    if exp_match:
+        fields["expiration"] = exp_match.group(1)
+
+    if us_wide_match and not area_hint:
+        # Clear US-wide signal and no area hints -> safe to mark US
+        fields["location_name"] = ""
+        fields["state"] = "US"
+        return {"rule": RULE_US_WIDE, "fields": fields, "fired": fired}
+
+    for rule, match in ((RULE_AREA, area_match), (RULE_AREA_FALLBACK, area_fallback)):
+        if not match:
+            continue
+        area_name = match.group(1).strip()
+        if rule == RULE_AREA_FALLBACK and area_name.lower() in GENERIC_AREA_WORDS:
+            break
+        fields["location_name"] = f"{area_name} Area"
+        fields["state"] = "AREA"
+        fields["area_name"] = area_name
+        return {"rule": rule, "fields": fields, "fired": fired}
+
+    return {"rule": RULE_AMBIGUOUS, "fields": fields, "fired": fired}
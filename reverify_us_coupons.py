@@ -2,11 +2,20 @@
 """
 One-time (and ongoing) script to re-verify coupons tagged state='US' but missing
 valid_text. Visits each URL, detects ended offers, and re-classifies via LLM.
+
+Pages are fetched through scraper.fetch_pages(), so they download concurrently
+and share the scraper's in-run page cache. That means the static HTML, read the
+way the scraper's own nightly check (purge_ended_offers) reads it: the
+#description and #terms_and_conditions sections, else all page text. This script
+used to render each page in a headless browser and read the whole <body>; text
+that only appears once the page's JavaScript runs is no longer seen, and a page
+with no static text at all is reported as an error and left as it is.
 """
-import os, json, re, time
-from playwright.sync_api import sync_playwright
+import os, sys, json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
 
-# Load .env
+# Load .env first: llm_classifier reads its settings at import time
 _env = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
 if os.path.exists(_env):
     with open(_env) as f:
@@ -16,55 +25,13 @@ if os.path.exists(_env):
                 k, v = line.split('=', 1)
                 os.environ.setdefault(k.strip(), v.strip())
 
-try:
-    import requests
-except ImportError:
-    requests = None
+import atomic_write
+import llm_classifier
+import offer_rules
+from scraper import fetch_pages
 
-GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 JSON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'coupons.json')
 
-ENDED_PHRASES = [
-    "this offer has ended",
-    "we're sorry! this offer has ended",
-    "offer has expired",
-    "this offer is no longer available",
-]
-
-
-def classify_with_llm(page_text):
-    if not GROQ_API_KEY or not requests:
-        return None
-    snippet_match = re.search(
-        r'(Valid[\s\S]{0,400}?(?:salons?|locations?|Expires[^\n]*|\d{1,2}/\d{1,2}/\d{4}))',
-        page_text, re.IGNORECASE
-    )
-    snippet = snippet_match.group(1).strip() if snippet_match else page_text[:500]
-    prompt = (
-        'Classify this Great Clips coupon validity text. Return ONLY a JSON object with: '
-        '"type" ("US", "AREA", or "LOCATION"), "area_name" (if AREA, else null), '
-        '"location_name" (if LOCATION, else null), "city" (if LOCATION, else null), '
-        '"state" (2-letter code if LOCATION, else null), "expiration" (MM/DD/YYYY if found, else null).\n\n'
-        f'Coupon text: "{snippet}"\n\nJSON only, no explanation.'
-    )
-    try:
-        resp = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={'Authorization': f'Bearer {GROQ_API_KEY}', 'Content-Type': 'application/json'},
-            json={
-                'model': 'llama-3.1-8b-instant',
-                'messages': [{'role': 'user', 'content': prompt}],
-                'temperature': 0, 'max_tokens': 200,
-                'response_format': {'type': 'json_object'},
-            },
-            timeout=15
-        )
-        resp.raise_for_status()
-        return json.loads(resp.json()['choices'][0]['message']['content'])
-    except Exception as e:
-        print(f'    ⚠️  LLM error: {e}')
-        return None
-
 
 def main():
     with open(JSON_FILE, encoding='utf-8') as f:
@@ -82,79 +49,60 @@ def main():
 
     ended_urls = set()
     updates = {}  # url -> updated fields
+    to_llm = []  # (index, code, url, page text) still live, to re-classify
+
+    pages = fetch_pages(c['url'] for c in to_check)
+
+    for i, (coupon, (url, page, fetch_error)) in enumerate(zip(to_check, pages), 1):
+        code = coupon.get('coupon_code', url.split('/')[-1])
+        print(f"[{i}/{len(to_check)}] {code} ({coupon.get('price', '?')})")
+
+        try:
+            if not page:
+                raise RuntimeError(f"fetch failed: {fetch_error or 'empty HTML response'}")
+            page_text = page["text"]
+            if not page_text:
+                raise RuntimeError("no text in the static HTML")
+
+            # Check if ended
+            if offer_rules.is_ended(page_text):
+                print(f"    🗑️  Offer ended — removing")
+                ended_urls.add(url)
+                continue
+
+            to_llm.append((i, code, url, page_text))
+
+        except Exception as e:
+            print(f"    ⚠️  Error: {str(e)[:60]}")
+
+    # Classify everything that is still live in one batch
+    if to_llm:
+        print(f"\n🤖 Classifying {len(to_llm)} live coupon(s)...")
+    llm_results = llm_classifier.classify_many(t[3] for t in to_llm)
+    for (i, code, url, page_text), llm in zip(to_llm, llm_results):
+        if not llm:
+            print(f"    ⚠️  {code}: LLM unavailable — leaving as-is")
+            continue
+
+        ctype, fields = llm_classifier.llm_fields(llm)
+        update = {}
+
+        # Try to grab valid_text
+        valid_text = offer_rules.valid_snippet(page_text)
+        if valid_text:
+            update['valid_text'] = valid_text
+        update.update(fields)
+
+        if ctype == 'US':
+            print(f"    ✅ {code}: Confirmed US-wide")
+        elif ctype == 'AREA':
+            print(f"    🗺️  {code}: Re-classified → AREA: {fields['area_name']}")
+        elif ctype == 'LOCATION':
+            print(f"    📍 {code}: Re-classified → LOCATION: {llm.get('location_name')}, {llm.get('city')}, {llm.get('state')}")
+        else:
+            print(f"    ❓ {code}: Unclassified by LLM")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ctx = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        page = ctx.new_page()
-
-        for i, coupon in enumerate(to_check, 1):
-            url = coupon['url']
-            code = coupon.get('coupon_code', url.split('/')[-1])
-            print(f"[{i}/{len(to_check)}] {code} ({coupon.get('price', '?')})")
-
-            try:
-                page.goto(url, wait_until="networkidle", timeout=15000)
-                time.sleep(1)
-                page_text = page.inner_text("body")
-
-                # Check if ended
-                if any(p in page_text.lower() for p in ENDED_PHRASES):
-                    print(f"    🗑️  Offer ended — removing")
-                    ended_urls.add(url)
-                    continue
-
-                # Try to grab valid_text
-                valid_match = re.search(
-                    r'(Valid[\s\S]{0,400}?(?:Expires\s+\d{1,2}/\d{1,2}/\d{4}|salons?\.))',
-                    page_text, re.IGNORECASE
-                )
-                valid_text = re.sub(r'\s+', ' ', valid_match.group(1).strip()) if valid_match else ''
-
-                # Use LLM to classify
-                llm = classify_with_llm(page_text)
-                if not llm:
-                    print(f"    ⚠️  LLM unavailable — leaving as-is")
-                    continue
-
-                ctype = (llm.get('type') or 'UNKNOWN').upper()
-                update = {}
-
-                if valid_text:
-                    update['valid_text'] = valid_text
-
-                if ctype == 'US':
-                    update['location_name'] = ''
-                    update['state'] = 'US'
-                    print(f"    ✅ Confirmed US-wide")
-                elif ctype == 'AREA':
-                    area_name = llm.get('area_name') or 'Unknown Area'
-                    update['location_name'] = area_name if 'area' in area_name.lower() else f"{area_name} Area"
-                    update['state'] = 'AREA'
-                    update['area_name'] = area_name
-                    if llm.get('expiration'):
-                        update['expiration'] = llm['expiration']
-                    print(f"    🗺️  Re-classified → AREA: {area_name}")
-                elif ctype == 'LOCATION':
-                    if llm.get('location_name'):
-                        update['location_name'] = llm['location_name']
-                    if llm.get('city'):
-                        update['city'] = llm['city']
-                    if llm.get('state'):
-                        update['state'] = llm['state']
-                    if llm.get('expiration'):
-                        update['expiration'] = llm['expiration']
-                    print(f"    📍 Re-classified → LOCATION: {llm.get('location_name')}, {llm.get('city')}, {llm.get('state')}")
-                else:
-                    update['state'] = 'UNKNOWN'
-                    print(f"    ❓ Unclassified by LLM")
-
-                updates[url] = update
-
-            except Exception as e:
-                print(f"    ⚠️  Error: {str(e)[:60]}")
-
-        browser.close()
+        updates[url] = update
 
     # Apply updates
     new_coupons = []
@@ -172,8 +120,7 @@ def main():
     data['coupons'] = new_coupons
     data['total_coupons'] = len(new_coupons)
 
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    atomic_write.write_json(JSON_FILE, data, indent=2)
 
     print(f"\n✅ Done: {reclassified} re-classified, {removed} removed (ended)")
     print(f"   Saved {len(new_coupons)} coupons to {JSON_FILE}")
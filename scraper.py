@@ -10,21 +10,21 @@ import json
 import time
 import os
 import sys
+import threading
+import urllib.parse
+from functools import lru_cache
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 try:
     import requests
 except ImportError:
     requests = None
 
-# Configuration
-SEARCH_URL = "https://www.facebook.com/ads/library/?active_status=active&ad_type=all&country=ALL&is_targeted_country=false&media_type=all&q=Great%20Clips%20coupon&search_type=keyword_unordered"
-OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(OUTPUT_DIR, "data")
-JSON_FILE = os.path.join(DATA_DIR, "coupons.json")
-
-# Load .env file for local development (no extra dependencies needed)
+# Load .env file for local development (no extra dependencies needed). This runs
+# before the local imports: llm_classifier reads its settings at import time.
 _env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
 if os.path.exists(_env_path):
     with open(_env_path) as _f:
@@ -34,16 +34,42 @@ if os.path.exists(_env_path):
                 _k, _v = _line.split('=', 1)
                 os.environ.setdefault(_k.strip(), _v.strip())
 
+import llm_classifier
+import offer_rules
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+import atomic_write  # noqa: E402
+import coupon_history  # noqa: E402
+
+# Configuration
+SEARCH_URL = "https://www.facebook.com/ads/library/?active_status=active&ad_type=all&country=ALL&is_targeted_country=false&media_type=all&q=Great%20Clips%20coupon&search_type=keyword_unordered"
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(OUTPUT_DIR, "data")
+JSON_FILE = os.path.join(DATA_DIR, "coupons.json")
+CHANGES_FILE = os.path.join(DATA_DIR, "coupon_changes.json")
+
 # Settings
 MAX_SCROLLS = 120  # Upper bound; the loop exits early once the feed stops growing
+SCROLL_WAIT_MS = 1000  # How long one scroll waits for the feed to grow before counting it as unchanged
+# Incremental mode: stop scrolling once this many scrolls in a row turned up only
+# offer codes already in data/coupons.json (scrolls that turned up none are not
+# counted). 0 always scrolls to the end.
+KNOWN_STOP_SCROLLS = int(os.environ.get('GC_KNOWN_STOP_SCROLLS', '10'))
 IS_CI = os.environ.get('CI') == 'true'  # Running in GitHub Actions?
-GROQ_API_KEY = os.environ.get('GROQ_API_KEY')  # Free at console.groq.com
 DEFAULT_COUPON_SOURCE = "facebook_ad_library"
 REQUEST_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 }
 REQUEST_SESSION = requests.Session() if requests else None
 
+# Offer pages are fetched on a small thread pool. Every host is capped at
+# PER_HOST_LIMIT requests in flight, started at least PER_HOST_INTERVAL seconds
+# apart, so a feed with hundreds of offers never hits offers.greatclips.com as a
+# burst. Set GC_FETCH_WORKERS=1 to fall back to one-at-a-time fetching.
+FETCH_WORKERS = int(os.environ.get('GC_FETCH_WORKERS', '8'))
+PER_HOST_LIMIT = int(os.environ.get('GC_PER_HOST_LIMIT', '4'))
+PER_HOST_INTERVAL = float(os.environ.get('GC_PER_HOST_INTERVAL', '0.2'))
+
 
 def _ensure_utf8_stdout():
     """Make emoji-rich logs work on Windows terminals that default to cp1252."""
@@ -134,48 +160,361 @@ def normalize_coupon_record(coupon, verified_at=None):
     return coupon
 
 
-def fetch_html(url, timeout=20):
-    """Fetch a coupon page with plain HTTP first; fall back to browser only if needed."""
-    if not requests:
-        return None
+class _HostThrottle:
+    """Per-host politeness: a concurrency cap plus a minimum gap between starts."""
+
+    def __init__(self, limit, interval):
+        self.limit = max(1, limit)
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, url):
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._slots.get(host)
+            if semaphore is None:
+                semaphore = self._slots[host] = threading.BoundedSemaphore(self.limit)
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+_HOST_THROTTLE = _HostThrottle(PER_HOST_LIMIT, PER_HOST_INTERVAL)
+_thread_state = threading.local()
 
+
+def _session():
+    """The shared session on the main thread, a private one on each worker."""
+    if threading.current_thread() is threading.main_thread():
+        return REQUEST_SESSION
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = _thread_state.session = requests.Session()
+    return session
+
+
+def _get_with_retry(url, timeout=20, headers=None):
+    """GET one URL under the host throttle, retrying once. Returns (response, error)."""
     last_error = None
     for attempt in range(2):
         try:
-            response = REQUEST_SESSION.get(url, headers=REQUEST_HEADERS, timeout=timeout)
+            with _HOST_THROTTLE.slot(url):
+                response = _session().get(url, headers=headers or REQUEST_HEADERS, timeout=timeout)
             response.raise_for_status()
-            return response.text
+            return response, None
         except Exception as e:
             last_error = e
             if attempt == 0:
                 time.sleep(0.5)
+    return None, last_error
+
+
+def _log_fetch_error(url, error):
+    print(f"   ⚠️  HTTP fetch failed for {url}: {error}")
 
-    print(f"   ⚠️  HTTP fetch failed for {url}: {last_error}")
-    return None
 
+def fetch_html(url, timeout=20):
+    """Fetch a coupon page with plain HTTP first; fall back to browser only if needed."""
+    if not requests:
+        return None
+
+    response, error = _get_with_retry(url, timeout)
+    if error is not None:
+        _log_fetch_error(url, error)
+        return None
+    return response.text
 
-def extract_offer_text(page_html):
+
+# Sections of an offer page that hold the real coupon copy, in output order.
+OFFER_SECTIONS = ("description", "terms_and_conditions")
+_IMAGE_HINT_RE = re.compile(r'coupon|offer|haircut', re.IGNORECASE)
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+_NON_TEXT_TAGS = {"script", "style", "template"}
+
+
+class _OfferPageParser(HTMLParser):
+    """
+    Single-pass tokenizer for offer pages - no DOM is built.
+
+    Collects the text of the first #description and #terms_and_conditions
+    elements, all visible page text as a fallback, the og:image meta and the
+    first coupon-looking <img>. Element ends follow the same rule BeautifulSoup's
+    html.parser tree uses: an end tag closes back to its nearest open match,
+    anywhere in the document, so closing an ancestor also closes a section left
+    open inside it.
     """
-    Pull just the visible coupon copy from a Great Clips offer page.
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = {}  # id -> {"depth": index in _open, "parts": [...]}
+        self.all_parts = []
+        self.og_image = None
+        self.img_src = None
+        self._open = []  # tags open in the whole document, outermost first
+        self._closed_void = []  # void tags whose stray </tag> is ignored
+        self._text = []  # data since the last tag event; BeautifulSoup sees one string
+        self._skip_depth = 0
+
+    def _open_sections(self):
+        return [state for state in self.sections.values() if state["depth"] is not None]
+
+    def _flush_text(self):
+        text = "".join(self._text).strip()
+        self._text = []
+        if not text:
+            return
+        self.all_parts.append(text)
+        for state in self._open_sections():
+            state["parts"].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in _NON_TEXT_TAGS:
+            self._skip_depth += 1
+
+        attrs = dict(attrs)
+        element_id = attrs.get("id")
+        if tag not in _VOID_TAGS:
+            self._open.append(tag)
+        else:
+            self._closed_void.append(tag)
+        if element_id in OFFER_SECTIONS and element_id not in self.sections:
+            # A void element still claims the id, as select_one would; it just
+            # has no text
+            depth = len(self._open) - 1 if tag not in _VOID_TAGS else None
+            self.sections[element_id] = {"depth": depth, "parts": []}
+
+        if tag == "meta" and self.og_image is None:
+            if (attrs.get("property") or "").lower() == "og:image" and attrs.get("content"):
+                self.og_image = attrs["content"]
+        elif tag == "img" and self.img_src is None:
+            for name, value in attrs.items():
+                if name.endswith("src") and value and _IMAGE_HINT_RE.search(value):
+                    self.img_src = value
+
+    def handle_startendtag(self, tag, attrs):
+        # <div id="x"/> opens and closes at once; treat it like a void element.
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_void:
+            # </img> after <img>: already closed, and it does not split the text
+            self._closed_void.remove(tag)
+            return
+        self._flush_text()
+        if tag in _NON_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag not in self._open:
+            return  # stray end tag: ignored, as the tree builder does
+        del self._open[len(self._open) - 1 - self._open[::-1].index(tag):]
+        for state in self._open_sections():
+            if state["depth"] >= len(self._open):
+                state["depth"] = None
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_decl(self, decl):
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+
+def parse_offer_page(page_html):
+    """
+    Reduce an offer page to what classification needs, in one pass.
 
     The raw HTML includes hidden template text such as "This offer has ended";
-    the actual coupon content lives in the description and terms sections.
+    the actual coupon content lives in the description and terms sections, so
+    "text" is those sections (or all page text if neither exists). "image_url"
+    is the og:image, else the main coupon <img>; "price" is the first dollar
+    amount in the text.
     """
-    soup = BeautifulSoup(page_html, "html.parser")
-    parts = []
+    parser = _OfferPageParser()
+    parser.feed(page_html)
+    parser.close()
+
+    parts = [
+        " ".join(parser.sections[element_id]["parts"])
+        for element_id in OFFER_SECTIONS
+        if element_id in parser.sections
+    ]
+    visible_text = " ".join(p for p in parts if p).strip()
+    if not visible_text:
+        visible_text = " ".join(parser.all_parts)
 
-    for selector in ("#description", "#terms_and_conditions"):
-        node = soup.select_one(selector)
-        if node:
-            text = node.get_text(" ", strip=True)
-            if text:
-                parts.append(text)
+    return {
+        "text": visible_text,
+        "image_url": parser.og_image or parser.img_src,
+        "price": offer_rules.extract_price(visible_text),
+    }
 
-    visible_text = " ".join(parts).strip()
-    if not visible_text:
-        visible_text = soup.get_text(" ", strip=True)
 
-    return soup, visible_text
+# Conditional-request cache, persisted between runs. For every offer page that
+# sent an ETag or Last-Modified header it keeps those validators plus the parsed
+# page, so a 304 Not Modified skips both the download and the parse. Bump
+# HTTP_CACHE_VERSION whenever parse_offer_page() changes what it returns. Only the
+# parsed result is stored, not the raw HTML: it is all the classifier reads, and
+# it keeps this committed file small. Entries unused for HTTP_CACHE_MAX_AGE_DAYS
+# are dropped on save. last_used is the Monday of the week an entry was last
+# used, so a daily run that revalidates the same pages leaves the file alone.
+HTTP_CACHE_FILE = os.path.join(DATA_DIR, "offer_http_cache.json")
+HTTP_CACHE_VERSION = 3
+HTTP_CACHE_MAX_AGE_DAYS = 30
+_HTTP_CACHE = None
+_HTTP_CACHE_DIRTY = False
+
+
+def _http_cache():
+    """Load data/offer_http_cache.json on first use."""
+    global _HTTP_CACHE
+    if _HTTP_CACHE is None:
+        _HTTP_CACHE = {}
+        if os.path.exists(HTTP_CACHE_FILE):
+            try:
+                with open(HTTP_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == HTTP_CACHE_VERSION:
+                    _HTTP_CACHE = data.get("pages", {})
+            except Exception as e:
+                print(f"   ⚠️ Could not load HTTP cache: {e}")
+    return _HTTP_CACHE
+
+
+def save_http_cache():
+    """Write the conditional-request cache back to data/, if anything changed."""
+    global _HTTP_CACHE_DIRTY
+    if not _HTTP_CACHE_DIRTY:
+        return
+
+    cutoff = (datetime.now() - timedelta(days=HTTP_CACHE_MAX_AGE_DAYS)).strftime('%Y-%m-%d')
+    pages = {
+        url: entry
+        for url, entry in sorted(_http_cache().items())
+        if entry.get("last_used", "") >= cutoff
+    }
+    atomic_write.write_json(
+        HTTP_CACHE_FILE, {"version": HTTP_CACHE_VERSION, "pages": pages}, indent=1, ensure_ascii=False
+    )
+    _HTTP_CACHE_DIRTY = False
+
+
+def _fetch_offer_page(url, timeout=20, cached=None):
+    """
+    Download and parse one offer page, revalidating against `cached` if given.
+
+    Returns (page, validators, not_modified, error). validators is None when
+    the server sent none. Never logs, so it is safe on a worker.
+    """
+    headers = dict(REQUEST_HEADERS)
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response, error = _get_with_retry(url, timeout, headers)
+    if error is not None:
+        return None, None, False, error
+    if response.status_code == 304 and cached:
+        return cached["page"], None, True, None
+
+    validators = {
+        key: value
+        for key, value in (
+            ("etag", response.headers.get("ETag")),
+            ("last_modified", response.headers.get("Last-Modified")),
+        )
+        if value
+    }
+    try:
+        return parse_offer_page(response.text), validators or None, False, None
+    except Exception as e:
+        return None, None, False, e
+
+
+# Pages fetched during this run, keyed by URL. fetch_offer_details,
+# purge_ended_offers and reverify_us_coupons.py all read through fetch_pages(),
+# so an offer scraped a moment ago is not downloaded again just to verify it.
+_PAGE_CACHE = {}
+_PAGE_CACHE_LOCK = threading.Lock()
+
+
+def fetch_pages(urls, workers=None, timeout=20):
+    """
+    Fetch and parse many offer pages concurrently, at most once per URL per run.
+
+    Returns (url, page, error) tuples in the same order as `urls`, whichever
+    download finishes first, so callers classify and log deterministically.
+    page is the parse_offer_page() dict, or None if the fetch failed.
+    """
+    global _HTTP_CACHE_DIRTY
+    urls = list(urls)
+    if not requests:
+        return [(url, None, None) for url in urls]
+
+    http_cache = _http_cache()
+    with _PAGE_CACHE_LOCK:
+        missing = [url for url in dict.fromkeys(urls) if url not in _PAGE_CACHE]
+
+    def fetch(url):
+        return _fetch_offer_page(url, timeout, http_cache.get(url))
+
+    workers = FETCH_WORKERS if workers is None else workers
+    if workers <= 1 or len(missing) <= 1:
+        results = [fetch(url) for url in missing]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            results = list(pool.map(fetch, missing))
+
+    now = datetime.now()
+    this_week = (now - timedelta(days=now.weekday())).strftime('%Y-%m-%d')
+    errors = {}
+    unchanged = 0
+    with _PAGE_CACHE_LOCK:
+        for url, (page, validators, not_modified, error) in zip(missing, results):
+            if page is None:
+                errors[url] = error
+                continue
+            _PAGE_CACHE[url] = page
+            if validators:
+                http_cache[url] = {**validators, "page": page, "last_used": this_week}
+                _HTTP_CACHE_DIRTY = True
+            elif not_modified:
+                unchanged += 1
+                if http_cache[url].get("last_used", "") < this_week:
+                    http_cache[url]["last_used"] = this_week
+                    _HTTP_CACHE_DIRTY = True
+        pages = {url: _PAGE_CACHE.get(url) for url in urls}
+
+    if unchanged:
+        print(f"   ♻️  {unchanged} of {len(missing)} page(s) unchanged since last run (HTTP 304)")
+    save_http_cache()
+
+    return [(url, pages[url], errors.get(url)) for url in urls]
 
 
 def load_existing_coupons():
@@ -196,30 +535,33 @@ def load_existing_coupons():
     return []
 
 
-def is_expired(coupon):
+@lru_cache(maxsize=None)
+def _parse_date(value, fmt):
+    """datetime.strptime, memoized - the same few dates repeat across every coupon."""
+    try:
+        return datetime.strptime(value, fmt)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_expired(coupon, now=None):
     """Check if a coupon has expired"""
+    now = now or datetime.now()
     exp_str = coupon.get('expiration', '')
     if not exp_str or exp_str == 'N/A':
         # If no expiration, check if it was added more than 30 days ago
         # BUT never expire manually added coupons without expiration
         if coupon.get('manual_add'):
             return False
-        added_date = coupon.get('added_date', '')
-        if added_date:
-            try:
-                added = datetime.strptime(added_date, '%Y-%m-%d')
-                if datetime.now() - added > timedelta(days=30):
-                    return True
-            except:
-                pass
-        return False
-    
-    try:
-        # Parse expiration date (format: MM/DD/YYYY)
-        exp_date = datetime.strptime(exp_str, '%m/%d/%Y')
-        return datetime.now() > exp_date
-    except:
-        return False
+        added = _parse_date(coupon.get('added_date', ''), '%Y-%m-%d')
+        return bool(added and now - added > timedelta(days=30))
+
+    # Parse expiration date (format: MM/DD/YYYY)
+    exp_date = _parse_date(exp_str, '%m/%d/%Y')
+    return bool(exp_date and now > exp_date)
+
+
+_OFFER_KEY_RE = re.compile(r'offers\.greatclips\.com/([^/?]+)')
 
 
 def get_coupon_key(coupon):
@@ -228,7 +570,7 @@ def get_coupon_key(coupon):
     url = coupon.get('url', '')
     if url:
         # Extract the offer ID from URL (e.g., https://offers.greatclips.com/9hKYiQx -> 9hKYiQx)
-        match = re.search(r'offers\.greatclips\.com/([^/?]+)', url)
+        match = _OFFER_KEY_RE.search(url)
         if match:
             return f"offer_{match.group(1)}"
     
@@ -250,11 +592,54 @@ def get_coupon_key(coupon):
     return f"url_{hash(url)}"
 
 
-def merge_coupons(existing_coupons, new_coupons):
-    """Merge new coupons with existing ones, avoiding duplicates and removing expired"""
+# The change journal: what one run did to the coupon set, written to
+# data/coupon_changes.json so later steps can act on the delta. Bookkeeping
+# fields (last_seen, last_verified, ...) do not count as an update.
+JOURNAL_KINDS = ("added", "updated", "expired", "ended")
+_JOURNAL_IGNORED_FIELDS = {"last_seen", "last_verified", "added_date"}
+
+
+def new_change_journal():
+    return {kind: [] for kind in JOURNAL_KINDS}
+
+
+def _journal_entry(coupon, key=None, changes=None):
+    entry = {
+        "key": key or get_coupon_key(coupon),
+        "coupon_code": coupon.get("coupon_code"),
+        "url": coupon.get("url"),
+        "location_name": coupon.get("location_name"),
+        "state": coupon.get("state"),
+        "price": coupon.get("price"),
+    }
+    if changes:
+        entry["changes"] = changes
+    return entry
+
+
+def _field_changes(before, after):
+    """{field: [old, new]} for every non-bookkeeping field that differs."""
+    return {
+        field: [before.get(field), after.get(field)]
+        for field in sorted(set(before) | set(after))
+        if field not in _JOURNAL_IGNORED_FIELDS and before.get(field) != after.get(field)
+    }
+
+
+def merge_coupons(existing_coupons, new_coupons, journal=None):
+    """
+    Merge new coupons with existing ones, avoiding duplicates and removing expired.
+
+    Coupons are indexed by key once and the new set is diffed against the old in
+    a single pass. If `journal` (see new_change_journal()) is given, every
+    coupon added, updated or expired is recorded in it.
+    """
     # Create a dict of existing coupons by key
     coupon_dict = {}
-    today = datetime.now().strftime('%Y-%m-%d')
+    now = datetime.now()
+    today = now.strftime('%Y-%m-%d')
+    if journal is None:
+        journal = new_change_journal()
     
     expired_count = 0
     kept_count = 0
@@ -264,10 +649,11 @@ def merge_coupons(existing_coupons, new_coupons):
     for coupon in existing_coupons:
         is_manual = coupon.get('manual_add', False)
         
-        if is_expired(coupon):
+        if is_expired(coupon, now):
             if is_manual:
                 print(f"   ⚠️ Manual coupon expired: {coupon.get('location_name', 'Unknown')} - {coupon.get('price', 'N/A')}")
             expired_count += 1
+            journal["expired"].append(_journal_entry(coupon))
             continue
         
         key = get_coupon_key(coupon)
@@ -286,18 +672,20 @@ def merge_coupons(existing_coupons, new_coupons):
     
     for coupon in new_coupons:
         key = get_coupon_key(coupon)
+        existing = coupon_dict.get(key)
         
-        if key not in coupon_dict:
+        if existing is None:
             # New coupon - add it with today's date
             coupon['added_date'] = today
             coupon['last_seen'] = today
             normalize_coupon_record(coupon, verified_at=today)
             coupon_dict[key] = coupon
             new_count += 1
+            journal["added"].append(_journal_entry(coupon, key))
             print(f"   ➕ New: {coupon.get('location_name', 'Unknown')[:30]} - {coupon.get('price', 'N/A')}")
         else:
             # Existing coupon - update last_seen, optionally update expiration
-            existing = coupon_dict[key]
+            before = dict(existing)
             
             # Only update expiration if new one is valid and existing isn't manual
             if coupon.get('expiration') and coupon.get('expiration') != 'N/A':
@@ -308,6 +696,9 @@ def merge_coupons(existing_coupons, new_coupons):
             existing['last_seen'] = today
             normalize_coupon_record(existing, verified_at=today)
             updated_count += 1
+            changes = _field_changes(before, existing)
+            if changes:
+                journal["updated"].append(_journal_entry(existing, key, changes))
     
     print(f"   ➕ Added {new_count} new coupons")
     print(f"   🔄 Updated {updated_count} existing coupons")
@@ -315,60 +706,30 @@ def merge_coupons(existing_coupons, new_coupons):
     return list(coupon_dict.values())
 
 
+def write_change_journal(journal):
+    """Write this run's change journal to data/coupon_changes.json."""
+    data = {
+        "generated_at": datetime.now().isoformat(),
+        "counts": {kind: len(journal[kind]) for kind in JOURNAL_KINDS},
+        **{kind: journal[kind] for kind in JOURNAL_KINDS},
+    }
+    atomic_write.write_json(CHANGES_FILE, data, volatile=("generated_at",), indent=2, ensure_ascii=False)
+    counts = ", ".join(f"{n} {kind}" for kind, n in data["counts"].items())
+    print(f"   📝 Change journal: {counts}")
+
+
 def classify_coupon_with_llm(page_text):
     """
     Use Groq's free LLM API to classify a coupon's validity text.
     Returns a dict with keys: type, area_name, location_name, city, state, expiration
     type is one of: 'US', 'AREA', 'LOCATION', 'UNKNOWN'
     Falls back to None on any error.
-    """
-    if not GROQ_API_KEY or not requests:
-        return None
-
-    # Only send the most relevant snippet to keep token usage minimal
-    # Look for the validity sentence
-    snippet_match = re.search(
-        r'(Valid[\s\S]{0,400}?(?:salons?|locations?|Expires[^\n]*|\d{1,2}/\d{1,2}/\d{4}))',
-        page_text, re.IGNORECASE
-    )
-    snippet = snippet_match.group(1).strip() if snippet_match else page_text[:500]
-
-    prompt = (
-        'Classify this Great Clips coupon validity text. '
-        'Return ONLY a JSON object with these exact fields:\n'
-        '- "type": "US" (valid anywhere in the US), "AREA" (valid only in a specific city/region), '
-        'or "LOCATION" (valid at one specific salon address)\n'
-        '- "area_name": the region description if AREA (e.g. "OKC area and N. Central & W OK area"), else null\n'
-        '- "location_name": the salon name if LOCATION, else null\n'
-        '- "city": the city if LOCATION, else null\n'
-        '- "state": 2-letter state code if LOCATION, else null\n'
-        '- "expiration": date as MM/DD/YYYY if found, else null\n\n'
-        f'Coupon text: "{snippet}"\n\n'
-        'JSON only, no explanation.'
-    )
 
-    try:
-        resp = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {GROQ_API_KEY}',
-                'Content-Type': 'application/json',
-            },
-            json={
-                'model': 'llama-3.1-8b-instant',
-                'messages': [{'role': 'user', 'content': prompt}],
-                'temperature': 0,
-                'max_tokens': 200,
-                'response_format': {'type': 'json_object'},
-            },
-            timeout=15,
-        )
-        resp.raise_for_status()
-        content = resp.json()['choices'][0]['message']['content']
-        return json.loads(content)
-    except Exception as e:
-        print(f'   ⚠️  Groq LLM error: {e}')
-        return None
+    Goes through llm_classifier, so a snippet seen before is answered from
+    data/llm_classifications.json even without an API key. Classify many
+    pages at once with llm_classifier.classify_many().
+    """
+    return llm_classifier.classify(page_text)
 
 
 def _apply_llm_classification(coupon, llm, code, idx, total):
@@ -378,53 +739,26 @@ def _apply_llm_classification(coupon, llm, code, idx, total):
         print(f"  ⚠️  [{idx}/{total}] {code} - Unclassified (LLM unavailable)")
         return
 
-    ctype = (llm.get("type") or "UNKNOWN").upper()
+    ctype, fields = llm_classifier.llm_fields(llm)
+    coupon.update(fields)
 
     if ctype == "US":
-        coupon["location_name"] = ""
-        coupon["state"] = "US"
         print(f"  ✅ [{idx}/{total}] {code} - US-Wide (LLM)")
-
     elif ctype == "AREA":
-        area_name = llm.get("area_name") or "Unknown Area"
-        coupon["location_name"] = area_name if "area" in area_name.lower() else f"{area_name} Area"
-        coupon["state"] = "AREA"
-        coupon["area_name"] = area_name
-        if llm.get("expiration"):
-            coupon["expiration"] = llm["expiration"]
-        print(f"  ✅ [{idx}/{total}] {code} - {area_name} (LLM)")
-
+        print(f"  ✅ [{idx}/{total}] {code} - {fields['area_name']} (LLM)")
     elif ctype == "LOCATION":
-        if llm.get("location_name"):
-            coupon["location_name"] = llm["location_name"]
-        if llm.get("city"):
-            coupon["city"] = llm["city"]
-        if llm.get("state"):
-            coupon["state"] = llm["state"]
-        if llm.get("expiration"):
-            coupon["expiration"] = llm["expiration"]
         print(f"  ✅ [{idx}/{total}] {code} - {llm.get('location_name', 'Location')} (LLM)")
-
     else:
-        coupon["state"] = "UNKNOWN"
         print(f"  ⚠️  [{idx}/{total}] {code} - Unclassified by LLM")
 
 
-# Phrases that indicate an offer page is no longer valid
-_ENDED_PHRASES = [
-    "this offer has ended",
-    "we're sorry! this offer has ended",
-    "offer has expired",
-    "this offer is no longer available",
-]
-
-
-def purge_ended_offers(coupons):
+def purge_ended_offers(coupons, journal=None):
     """
     Visit every coupon URL and:
     - Remove any whose page shows an 'offer ended' message
     - Re-classify any state='US' coupons missing valid_text (old fallback mis-tags)
     Manual coupons (manual_add=True) are skipped.
+    Removals and re-classifications are recorded in `journal` if given.
     Returns the cleaned list.
     """
     to_purge_check = [c for c in coupons if c.get('url') and not c.get('manual_add')]
@@ -434,88 +768,88 @@ def purge_ended_offers(coupons):
     if not to_purge_check:
         return coupons
 
+    with _PAGE_CACHE_LOCK:
+        already_fetched = sum(1 for c in to_purge_check if c['url'] in _PAGE_CACHE)
+
     print()
-    print(f"🔍 Verifying {len(to_purge_check)} offer URLs ({len(to_reclassify)} US coupons to re-classify)...")
+    print(f"🔍 Verifying {len(to_purge_check)} offer URLs ({len(to_reclassify)} US coupons to re-classify, "
+          f"{already_fetched} already fetched this run)...")
 
     today = datetime.now().strftime('%Y-%m-%d')
     ended_urls = set()
     verified_urls = set()
     reclassify_updates = {}  # url -> updated fields
+    to_llm = []  # (index, code, url, page text) of coupons to re-classify
+
+    pages = fetch_pages(c['url'] for c in to_purge_check)
 
-    for i, coupon in enumerate(to_purge_check, 1):
-        url = coupon['url']
+    for i, (coupon, (url, page, fetch_error)) in enumerate(zip(to_purge_check, pages), 1):
         code = coupon.get('coupon_code', url.split('/')[-1])
         needs_reclassify = url in to_reclassify_urls
 
         try:
-            page_html = fetch_html(url)
-            if not page_html:
+            if fetch_error is not None:
+                _log_fetch_error(url, fetch_error)
+            if not page:
                 raise RuntimeError("empty HTML response")
 
-            _, page_text = extract_offer_text(page_html)
+            page_text = page["text"]
             verified_urls.add(url)
 
             # Check for ended offers
-            if any(phrase in page_text.lower() for phrase in _ENDED_PHRASES):
+            if offer_rules.is_ended(page_text):
                 ended_urls.add(url)
                 print(f"  🗑️  [{i}/{len(to_purge_check)}] {code} - Offer ended, removing")
                 continue
 
-            # Re-classify US coupons that were tagged by the old fallback
+            # Re-classify US coupons that were tagged by the old fallback,
+            # all in one batch once every page has been checked
             if needs_reclassify:
-                llm = classify_coupon_with_llm(page_text)
-                if llm:
-                    ctype = (llm.get('type') or 'UNKNOWN').upper()
-                    update = {'last_verified': today}
-                    # Capture valid_text if found
-                    vm = re.search(
-                        r'(Valid[\s\S]{0,400}?(?:Expires\s+\d{1,2}/\d{1,2}/\d{4}|salons?\.))',
-                        page_text, re.IGNORECASE
-                    )
-                    if vm:
-                        update['valid_text'] = re.sub(r'\s+', ' ', vm.group(1).strip())
-
-                    if ctype == 'US':
-                        update['location_name'] = ''
-                        update['state'] = 'US'
-                        print(f"  ✅ [{i}/{len(to_purge_check)}] {code} - Confirmed US-wide (LLM)")
-                    elif ctype == 'AREA':
-                        area_name = llm.get('area_name') or 'Unknown Area'
-                        update['location_name'] = area_name if 'area' in area_name.lower() else f"{area_name} Area"
-                        update['state'] = 'AREA'
-                        update['area_name'] = area_name
-                        if llm.get('expiration'):
-                            update['expiration'] = llm['expiration']
-                        print(f"  🗺️  [{i}/{len(to_purge_check)}] {code} - Re-classified → AREA: {area_name}")
-                    elif ctype == 'LOCATION':
-                        if llm.get('location_name'):
-                            update['location_name'] = llm['location_name']
-                        if llm.get('city'):
-                            update['city'] = llm['city']
-                        if llm.get('state'):
-                            update['state'] = llm['state']
-                        if llm.get('expiration'):
-                            update['expiration'] = llm['expiration']
-                        print(f"  📍 [{i}/{len(to_purge_check)}] {code} - Re-classified → LOCATION: {llm.get('location_name')}")
-                    else:
-                        update['state'] = 'UNKNOWN'
-                        print(f"  ⚠️  [{i}/{len(to_purge_check)}] {code} - Unclassified by LLM")
-
-                    reclassify_updates[url] = update
-                else:
-                    print(f"  ⚠️  [{i}/{len(to_purge_check)}] {code} - LLM unavailable, leaving as-is")
+                to_llm.append((i, code, url, page_text))
 
         except Exception as e:
             print(f"  ⚠️  [{i}/{len(to_purge_check)}] {code} - Unreachable: {str(e)[:40]}")
 
+    llm_results = llm_classifier.classify_many(t[3] for t in to_llm)
+    for (i, code, url, page_text), llm in zip(to_llm, llm_results):
+        if not llm:
+            print(f"  ⚠️  [{i}/{len(to_purge_check)}] {code} - LLM unavailable, leaving as-is")
+            continue
+
+        ctype, fields = llm_classifier.llm_fields(llm)
+        update = {'last_verified': today}
+        # Capture valid_text if found
+        valid_text = offer_rules.valid_snippet(page_text)
+        if valid_text:
+            update['valid_text'] = valid_text
+        update.update(fields)
+
+        if ctype == 'US':
+            print(f"  ✅ [{i}/{len(to_purge_check)}] {code} - Confirmed US-wide (LLM)")
+        elif ctype == 'AREA':
+            print(f"  🗺️  [{i}/{len(to_purge_check)}] {code} - Re-classified → AREA: {fields['area_name']}")
+        elif ctype == 'LOCATION':
+            print(f"  📍 [{i}/{len(to_purge_check)}] {code} - Re-classified → LOCATION: {llm.get('location_name')}")
+        else:
+            print(f"  ⚠️  [{i}/{len(to_purge_check)}] {code} - Unclassified by LLM")
+
+        reclassify_updates[url] = update
+
     # Apply all changes
+    if journal is None:
+        journal = new_change_journal()
     cleaned = []
     for c in coupons:
         url = c.get('url', '')
         if url in ended_urls:
+            journal["ended"].append(_journal_entry(c))
             continue
         if url in reclassify_updates:
+            before = dict(c)
             c.update(reclassify_updates[url])
+            changes = _field_changes(before, c)
+            if changes:
+                journal["updated"].append(_journal_entry(c, changes=changes))
         if url in verified_urls:
             normalize_coupon_record(c, verified_at=today)
         cleaned.append(c)
@@ -530,8 +864,84 @@ def purge_ended_offers(coupons):
     return cleaned
 
 
-def scrape_facebook_ad_library():
-    """Open Facebook Ad Library, scroll to load ads, extract offer URLs"""
+# Collects candidate hrefs from the live DOM without serializing the whole page.
+_DOM_OFFER_HREFS_JS = """() => Array.from(document.querySelectorAll('a[href]'), a => a.href)
+    .filter(h => h.includes('offers.greatclips.com') || h.includes('l.php') || h.includes('lm.facebook.com'))"""
+# One pattern for every shape an offer link takes in the Ad Library: plain
+# ("https://offers..."), JSON-escaped ("https:\/\/offers...") and
+# percent-encoded inside l.php redirects ("https%3A%2F%2Foffers..."). Group 1 is
+# the scheme, group 2 the offer code.
+_OFFER_LINK_RE = re.compile(
+    r'(https?)(?::|%3[Aa])(?:\\?/|%2[Ff]){2}offers\.greatclips\.com(?:\\?/|%2[Ff])([A-Za-z0-9]+)'
+)
+# Characters kept back between chunks so a link split across two reads is still
+# seen whole; comfortably longer than any encoded offer link.
+_OFFER_LINK_OVERLAP = 200
+
+# The browser only needs the feed's markup and data; images, video and fonts are
+# most of the bytes on a long Ad Library feed and carry no offer links.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+# Responses worth scanning for offer links: the GraphQL/XHR calls that stream
+# ads in as the page scrolls, plus the initial document's inline JSON.
+SCANNED_RESOURCE_TYPES = {"xhr", "fetch", "document"}
+
+
+def iter_offer_urls(chunks):
+    """
+    Yield offer URLs from HTML/JSON text in one linear pass, without parsing it.
+
+    `chunks` is a string or any iterable of strings (e.g. a streamed response),
+    so a multi-megabyte page never has to sit in memory twice. URLs come out
+    normalized to "<scheme>://offers.greatclips.com/<code>" and may repeat.
+    """
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        safe = len(buf) - _OFFER_LINK_OVERLAP
+        if safe <= 0:
+            continue
+        for match in _OFFER_LINK_RE.finditer(buf):
+            if match.start() >= safe:
+                break
+            yield f"{match.group(1)}://offers.greatclips.com/{match.group(2)}"
+        buf = buf[safe:]
+
+    for match in _OFFER_LINK_RE.finditer(buf):
+        yield f"{match.group(1)}://offers.greatclips.com/{match.group(2)}"
+
+
+def load_known_offer_codes():
+    """Offer codes already in data/coupons.json, for the incremental early stop."""
+    if not os.path.exists(JSON_FILE):
+        return set()
+    try:
+        with open(JSON_FILE, 'r', encoding='utf-8') as f:
+            coupons = json.load(f).get('coupons', [])
+    except Exception:
+        return set()
+    return {
+        c.get('coupon_code') or c['url'].rstrip('/').split('/')[-1]
+        for c in coupons
+        if c.get('url') or c.get('coupon_code')
+    }
+
+
+def scrape_facebook_ad_library(known_codes=None):
+    """
+    Open Facebook Ad Library, scroll to load ads, extract offer URLs.
+
+    Offer links are harvested as the feed loads - from the GraphQL/JSON
+    responses and from the DOM after every scroll - while images, video and
+    fonts are never downloaded. When known_codes is given, scrolling stops once
+    KNOWN_STOP_SCROLLS scrolls in a row have surfaced offers and none outside
+    it, the usual run where no new ads are live.
+
+    Returns (html_content, harvested_urls). html_content is None unless
+    harvesting found nothing and the full page is needed as a fallback.
+    """
     print("=" * 60)
     print("🏪 Great Clips Coupon Scraper")
     print("=" * 60)
@@ -546,13 +956,36 @@ def scrape_facebook_ad_library():
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
         
+        context.route(
+            "**/*",
+            lambda route: route.abort()
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+            else route.continue_(),
+        )
+
+        harvested = set()
+
+        def on_response(response):
+            # Pull offer links straight out of the ad payloads as they stream in.
+            if response.request.resource_type not in SCANNED_RESOURCE_TYPES:
+                return
+            try:
+                body = response.text()
+            except Exception:
+                return  # redirects and aborted requests have no body
+            harvested.update(iter_offer_urls(body))
+
         page = context.new_page()
+        page.on("response", on_response)
         
         print(f"🌐 Navigating to Facebook Ad Library...")
         page.goto(SEARCH_URL, wait_until="networkidle", timeout=60000)
         
         print("⏳ Waiting for page to load...")
-        time.sleep(5)
+        try:
+            page.wait_for_selector('a[href*="l.php"], a[href*="offers.greatclips.com"]', timeout=5000)
+        except PlaywrightTimeoutError:
+            pass
         
         # Handle cookie consent
         try:
@@ -564,16 +997,30 @@ def scrape_facebook_ad_library():
             pass
         
         # Scroll to load results
-        print(f"📜 Scrolling to load ads (max {MAX_SCROLLS} scrolls)...")
+        incremental = bool(known_codes) and KNOWN_STOP_SCROLLS > 0
+        if incremental:
+            print(f"📜 Scrolling to load ads (max {MAX_SCROLLS} scrolls, "
+                  f"stopping after {KNOWN_STOP_SCROLLS} with only known offers)...")
+        else:
+            print(f"📜 Scrolling to load ads (max {MAX_SCROLLS} scrolls)...")
         
-        last_height = 0
+        last_height = page.evaluate("document.body.scrollHeight")
         scroll_count = 0
         no_change_count = 0
+        known_only_count = 0
+        seen = set(harvested)
         
         while scroll_count < MAX_SCROLLS:
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             scroll_count += 1
-            time.sleep(1)
+
+            # Wait for the feed to grow rather than sleeping a fixed second.
+            try:
+                page.wait_for_function(
+                    "h => document.body.scrollHeight > h", arg=last_height, timeout=SCROLL_WAIT_MS
+                )
+            except PlaywrightTimeoutError:
+                pass
             
             new_height = page.evaluate("document.body.scrollHeight")
             
@@ -586,50 +1033,43 @@ def scrape_facebook_ad_library():
                 no_change_count = 0
                 
             last_height = new_height
+
+            for href in page.evaluate(_DOM_OFFER_HREFS_JS):
+                harvested.update(iter_offer_urls(href))
+            fresh = harvested - seen
+            seen |= fresh
+
+            # Only a scroll that surfaced offers, all of them known, counts
+            # towards stopping: one that surfaced nothing may just be a feed
+            # that is slow to load.
+            if incremental and fresh:
+                if any(url.split("/")[-1] not in known_codes for url in fresh):
+                    known_only_count = 0
+                else:
+                    known_only_count += 1
+                if known_only_count >= KNOWN_STOP_SCROLLS:
+                    print(f"   ✅ Nothing new for {known_only_count} scrolls, stopping after {scroll_count}")
+                    break
             
             if scroll_count % 10 == 0:
-                print(f"   📄 Scrolled {scroll_count} times...")
+                print(f"   📄 Scrolled {scroll_count} times ({len(harvested)} offers so far)...")
         
-        html_content = page.content()
+        # The response listener and DOM scan already hold the offer set; only
+        # serialize the whole feed when they came up empty.
+        html_content = None if harvested else page.content()
         browser.close()
     
-    return html_content
+    if harvested:
+        print(f"   ✅ Collected {len(harvested)} unique offer URLs while scrolling")
+    return html_content, harvested
 
 
 def extract_offer_urls(html_content):
     """Extract all offers.greatclips.com URLs from the HTML"""
     print()
     print("🔍 Extracting offer URLs...")
-    
-    soup = BeautifulSoup(html_content, "html.parser")
-    offer_pattern = r'https?://offers\.greatclips\.com/[A-Za-z0-9]+'
-    
-    offer_urls = set()
-    
-    # Search all links
-    for link in soup.find_all("a", href=True):
-        href = link.get("href", "")
-        if "offers.greatclips.com" in href:
-            matches = re.findall(offer_pattern, href)
-            offer_urls.update(matches)
-        
-        if "l.php" in href or "lm.facebook.com" in href:
-            import urllib.parse
-            decoded = urllib.parse.unquote(href)
-            matches = re.findall(offer_pattern, decoded)
-            offer_urls.update(matches)
-    
-    # Search entire HTML
-    all_text = str(soup)
-    text_matches = re.findall(offer_pattern, all_text)
-    offer_urls.update(text_matches)
-    
-    # Clean URLs
-    cleaned_urls = set()
-    for url in offer_urls:
-        clean = url.split("?")[0].split("&")[0].split("#")[0]
-        if clean.startswith("http"):
-            cleaned_urls.add(clean)
+
+    cleaned_urls = set(iter_offer_urls(html_content))
     
     print(f"   ✅ Found {len(cleaned_urls)} unique offer URLs")
     return list(cleaned_urls)
@@ -639,152 +1079,79 @@ def fetch_offer_details(offer_urls):
     """Visit each offer URL and extract details"""
     print()
     print("🔄 Fetching details from each coupon page...")
-    print(f"   Processing {len(offer_urls)} coupons...")
+    print(f"   Processing {len(offer_urls)} coupons with up to {FETCH_WORKERS} workers...")
     print()
     
     coupons = []
     today = datetime.now().strftime('%Y-%m-%d')
-    
-    for i, url in enumerate(offer_urls, 1):
+    parsed = []  # coupons in page order, checked for useful data at the end
+    to_llm = []  # (coupon, page text, index, generic area wording) the rules could not place
+
+    # Download every page up front on the thread pool, then classify serially in
+    # the original order so the log reads the same as a one-at-a-time run.
+    pages = fetch_pages(offer_urls)
+
+    for i, (url, page, fetch_error) in enumerate(pages, 1):
         code = url.split("/")[-1]
         coupon = {"url": url, "coupon_code": code}
 
         try:
-            page_html = fetch_html(url)
-            if not page_html:
+            if fetch_error is not None:
+                _log_fetch_error(url, fetch_error)
+            if not page:
                 raise RuntimeError("empty HTML response")
 
-            soup, page_text = extract_offer_text(page_html)
+            page_text = page["text"]
+            result = offer_rules.classify_offer_text(page_text)
+            rule = result["rule"]
 
             # Skip offers that have already ended
-            if "this offer has ended" in page_text.lower():
+            if rule == offer_rules.RULE_ENDED:
                 print(f"  🗑️  [{i}/{len(offer_urls)}] {code} - Offer ended, skipping")
                 continue
 
-            # Try to extract coupon image
-            # Look for og:image meta tag first (most reliable)
-            og_image = re.search(r'<meta[^>]*property=["\']og:image["\'][^>]*content=["\']([^"\']+)["\']', page_html, re.IGNORECASE)
-            if not og_image:
-                og_image = re.search(r'<meta[^>]*content=["\']([^"\']+)["\'][^>]*property=["\']og:image["\']', page_html, re.IGNORECASE)
-
-            if og_image:
-                coupon["image_url"] = og_image.group(1)
-            else:
-                # Fallback: look for main coupon image
-                img_match = re.search(r'<img[^>]*src=["\']([^"\']*(?:coupon|offer|haircut)[^"\']*)["\']', page_html, re.IGNORECASE)
-                if img_match:
-                    coupon["image_url"] = img_match.group(1)
-
-            # Extract "Valid at Great Clips..." text
-            valid_match = re.search(
-                r'(Valid at Great Clips\s+.+?Expires\s+\d{1,2}/\d{1,2}/\d{4})',
-                page_text,
-                re.IGNORECASE | re.DOTALL
-            )
-
-            if valid_match:
-                valid_text = re.sub(r'\s+', ' ', valid_match.group(1).strip())
-                coupon["valid_text"] = valid_text
-
-                # Extract location details
-                full_match = re.search(
-                    r'Valid (?:at Great Clips|only at)\s+(.+?)\s+at\s+(.+?)\s+in\s+(.+?)\s+([A-Z]{2})[\.\s]',
-                    valid_text
-                )
-
-                if full_match:
-                    coupon["location_name"] = full_match.group(1).strip()
-                    coupon["address"] = full_match.group(2).strip()
-                    coupon["city"] = full_match.group(3).strip()
-                    coupon["state"] = full_match.group(4).strip()
-
-                exp_match = re.search(r'Expires\s+(\d{1,2}/\d{1,2}/\d{4})', valid_text)
-                if exp_match:
-                    coupon["expiration"] = exp_match.group(1)
+            if page.get("image_url"):
+                coupon["image_url"] = page["image_url"]
+            coupon.update(result["fields"])
 
+            if rule == offer_rules.RULE_VALID_TEXT:
                 print(f"  ✅ [{i}/{len(offer_urls)}] {code} - {coupon.get('location_name', 'Found')}")
+            elif rule == offer_rules.RULE_US_WIDE:
+                print(f"  ✅ [{i}/{len(offer_urls)}] {code} - US-Wide Coupon")
+            elif rule in (offer_rules.RULE_AREA, offer_rules.RULE_AREA_FALLBACK):
+                print(f"  ✅ [{i}/{len(offer_urls)}] {code} - {coupon['area_name']} Area Coupon")
             else:
-                # ── Fast-path regex checks ──────────────────────────────────
-                # 1. Explicit US-wide language ("participating US salons", etc.)
-                us_wide_match = re.search(
-                    r'(?:participating\s+US|all\s+US|any\s+(?:US\s+)?Great\s+Clips|'
-                    r'all\s+Great\s+Clips\s+(?:locations?|salons?)|'
-                    r'all\s+participating\s+(?:US\s+)?Great\s+Clips)',
-                    page_text,
-                    re.IGNORECASE
-                )
-                # 2. Any "area" language → definitely NOT US-wide
-                any_area_hint = re.search(
-                    r'\b(?:area|region|metro)\b.{0,60}(?:Great\s+Clips|salons?|locations?)',
-                    page_text, re.IGNORECASE
-                )
-                # 3. Narrow area regex (original, kept for speed)
-                area_match = re.search(
-                    r'(?:participating|only at)\s+([A-Za-z\s]+?)\s+area\s+Great\s+Clips',
-                    page_text, re.IGNORECASE
-                )
-                # 4. Broader area fallback
-                area_fallback = re.search(
-                    r'([A-Za-z][\w\s,\.&-]{2,60}?)\s+area\s+(?:Great\s+Clips\s+)?salons?',
-                    page_text, re.IGNORECASE
-                )
-
-                # Always try to grab expiration
-                exp_match = re.search(r'Expires?\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})', page_text, re.IGNORECASE)
-                if exp_match:
-                    coupon["expiration"] = exp_match.group(1)
-
-                if us_wide_match and not any_area_hint:
-                    # Clear US-wide signal and no area hints → safe to mark US
-                    coupon["location_name"] = ""
-                    coupon["state"] = "US"
-                    print(f"  ✅ [{i}/{len(offer_urls)}] {code} - US-Wide Coupon")
-
-                elif area_match:
-                    area_name = area_match.group(1).strip()
-                    coupon["location_name"] = f"{area_name} Area"
-                    coupon["state"] = "AREA"
-                    coupon["area_name"] = area_name
-                    print(f"  ✅ [{i}/{len(offer_urls)}] {code} - {area_name} Area Coupon")
-
-                elif area_fallback:
-                    area_name = area_fallback.group(1).strip()
-                    bad = {'the', 'your', 'local', 'nearby', 'this', 'a', 'an', 'any'}
-                    if area_name.lower() not in bad:
-                        coupon["location_name"] = f"{area_name} Area"
-                        coupon["state"] = "AREA"
-                        coupon["area_name"] = area_name
-                        print(f"  ✅ [{i}/{len(offer_urls)}] {code} - {area_name} Area Coupon")
-                    else:
-                        # Ambiguous — ask the LLM
-                        llm = classify_coupon_with_llm(page_text)
-                        _apply_llm_classification(coupon, llm, code, i, len(offer_urls))
-
-                else:
-                    # ── Ambiguous: no clear signal either way ──────────────
-                    # Try LLM first; fall back conservatively to AREA/unknown
-                    llm = classify_coupon_with_llm(page_text)
-                    if llm:
-                        _apply_llm_classification(coupon, llm, code, i, len(offer_urls))
-                    elif not coupon.get("location_name") and not coupon.get("address") and not coupon.get("city"):
-                        # No LLM key configured and nothing parsed — leave unclassified
-                        # rather than wrongly promoting to US-wide featured section
-                        coupon["state"] = "UNKNOWN"
-                        print(f"  ⚠️  [{i}/{len(offer_urls)}] {code} - Unclassified (no LLM key)")
-                    else:
-                        print(f"  ⚠️  [{i}/{len(offer_urls)}] {code} - Limited info")
+                # Ambiguous — ask the LLM, in one batch after the loop
+                to_llm.append((coupon, page_text, i, "area_fallback" in result["fired"]))
 
             # Get price
-            price_match = re.search(r'\$(\d+\.?\d{0,2})', page_text)
-            if price_match:
-                coupon["price"] = "$" + price_match.group(1)
+            if page.get("price"):
+                coupon["price"] = page["price"]
 
         except Exception as e:
             print(f"  ❌ [{i}/{len(offer_urls)}] {code} - Error: {str(e)[:40]}")
             # Skip coupons with errors - they have no useful data
             continue
 
-        # Only save coupons that have useful data (price or location)
+        parsed.append(coupon)
+
+    llm_results = llm_classifier.classify_many(t[1] for t in to_llm)
+    for (coupon, _, i, generic_area), llm in zip(to_llm, llm_results):
+        code = coupon["coupon_code"]
+        if llm or generic_area:
+            # Area wording with no usable name ("your area salons") is always
+            # settled by the LLM, or marked unclassified without it
+            _apply_llm_classification(coupon, llm, code, i, len(offer_urls))
+        elif not coupon.get("location_name") and not coupon.get("address") and not coupon.get("city"):
+            # No LLM key configured and nothing parsed — leave unclassified
+            # rather than wrongly promoting to US-wide featured section
+            coupon["state"] = "UNKNOWN"
+            print(f"  ⚠️  [{i}/{len(offer_urls)}] {code} - Unclassified (no LLM key)")
+        else:
+            print(f"  ⚠️  [{i}/{len(offer_urls)}] {code} - Limited info")
+
+    # Only save coupons that have useful data (price or location)
+    for coupon in parsed:
         if coupon.get("price") or coupon.get("location_name") or coupon.get("state"):
             normalize_coupon_record(coupon, verified_at=today)
             coupons.append(coupon)
@@ -806,11 +1173,13 @@ def save_results(new_coupons):
     # Load existing coupons
     existing_coupons = load_existing_coupons()
     
-    # Merge new coupons with existing (removes expired, avoids duplicates)
-    coupons = merge_coupons(existing_coupons, new_coupons)
+    # Merge new coupons with existing (removes expired, avoids duplicates),
+    # recording what changed for the steps that run after the scrape
+    journal = new_change_journal()
+    coupons = merge_coupons(existing_coupons, new_coupons, journal)
 
     # Remove any coupons whose offer page now shows "This offer has ended"
-    coupons = purge_ended_offers(coupons)
+    coupons = purge_ended_offers(coupons, journal)
 
     # Sort by price (but keep manual/US-wide coupons at the end for visibility)
     def get_sort_key(c):
@@ -830,10 +1199,31 @@ def save_results(new_coupons):
         "coupons": coupons
     }
     
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    atomic_write.write_json(JSON_FILE, data, indent=2)
     
     print(f"   ✅ Saved to: {JSON_FILE}")
+    write_change_journal(journal)
+
+    # Log what this run changed - including coupons that expire before the next
+    # run - so an unchanged run leaves data/history/ alone. Coupons the history
+    # has never seen are logged too, so coupons live since before it started count
+    changed_keys = {entry["key"] for entry in journal["added"]} | {
+        entry["key"]
+        for entry in journal["updated"]
+        if set(entry.get("changes", ())) & set(coupon_history.OBSERVED_FIELDS)
+    }
+    recorded = coupon_history.recorded_keys()
+    changed = [
+        c for c in coupons
+        if get_coupon_key(c) in changed_keys or coupon_history.coupon_key(c) not in recorded
+    ]
+    gone = journal["expired"] + journal["ended"]
+    segment = coupon_history.append_run(changed, ended=gone)
+    if segment:
+        print(
+            f"   🗂️  Appended {len(changed)} observation(s) and {len(gone)} ended coupon(s) "
+            f"to {os.path.relpath(segment, OUTPUT_DIR)}"
+        )
     
     # Stats
     with_location = sum(1 for c in coupons if c.get("location_name"))
@@ -859,11 +1249,14 @@ def save_results(new_coupons):
 
 
 def main():
-    # Step 1: Scrape Facebook Ad Library
-    html_content = scrape_facebook_ad_library()
+    # Step 1: Scrape Facebook Ad Library (stops early once only known offers show up)
+    html_content, harvested_urls = scrape_facebook_ad_library(load_known_offer_codes())
     
-    # Step 2: Extract offer URLs
-    offer_urls = extract_offer_urls(html_content)
+    # Step 2: Extract offer URLs (full-page parse only if harvesting found nothing)
+    offer_urls = set(harvested_urls)
+    if html_content:
+        offer_urls.update(extract_offer_urls(html_content))
+    offer_urls = sorted(offer_urls)
     
     if not offer_urls:
         print("⚠️ No new offer URLs found in Facebook Ad Library")
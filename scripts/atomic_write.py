@@ -0,0 +1,111 @@
+"""
+Crash-safe writes for generated data files.
+
+A step that dies mid-write - a crash, a cancelled Actions run - must never leave
+a truncated file behind for the next step to fail on. Everything here writes to
+a temp file in the target's directory, fsyncs it and renames it over the target,
+so a reader only ever sees the old file or the new one. When the new content
+hashes the same as what is already on disk nothing is written at all, which
+keeps unchanged runs out of git.
+
+    import atomic_write
+    atomic_write.write_json(path, payload, indent=1, ensure_ascii=False)
+
+Every function returns True if the file was written, False if it was unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def file_digest(path: str | os.PathLike) -> str | None:
+    """sha256 of a file's bytes, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _new_file_mode(path: Path) -> int:
+    """Keep an existing file's permissions; new files get the usual 0666 & ~umask."""
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist the rename itself. Not possible (or needed) on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_bytes(path: str | os.PathLike, data: bytes) -> bool:
+    path = Path(path)
+    if file_digest(path) == hashlib.sha256(data).hexdigest():
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = _new_file_mode(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+    return True
+
+
+def write_text(path: str | os.PathLike, text: str, encoding: str = "utf-8") -> bool:
+    return write_bytes(path, text.encode(encoding))
+
+
+def write_json(
+    path: str | os.PathLike,
+    data,
+    volatile: tuple[str, ...] = (),
+    **dump_kwargs,
+) -> bool:
+    """json.dump `data` to `path` atomically.
+
+    `volatile` names top-level keys - timestamps such as "generated_at" - that
+    change on every run without saying anything new. If only those differ from
+    the file on disk, the old file is kept as it is.
+    """
+    if volatile and isinstance(data, dict):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                existing = json.load(fh)
+        except (OSError, ValueError):
+            existing = None
+        if isinstance(existing, dict):
+            def stable(d: dict) -> dict:
+                return {k: v for k, v in d.items() if k not in volatile}
+            if stable(existing) == stable(data):
+                return False
+    return write_text(path, json.dumps(data, **dump_kwargs))
@@ -0,0 +1,758 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hot paths in the scraper and the build scripts.
+
+Each subcommand times the current implementation against the reference
+implementation it replaced, on the same input, and checks that both give the
+same answer. A benchmark that disagrees exits non-zero, so these double as
+parity checks after editing either side.
+
+Fixtures are pages recorded from the live sites and committed under
+tests/fixtures/<kind>/; `record` saves a fresh set of offer and salon pages
+there. Ad Library pages only exist once a browser has run the feed's JavaScript,
+so those are saved from a browser by hand. When a kind has no recorded pages, a
+synthetic fixture is generated (and says so) so the comparison still runs.
+
+Usage:
+    python scripts/benchmarks.py offer-urls [PAGE.html ...]
+    python scripts/benchmarks.py offer-pages [PAGE.html ...]
+    python scripts/benchmarks.py offer-rules [PAGE.html ...]
+    python scripts/benchmarks.py salon-parse [PAGE.html ...]
+    python scripts/benchmarks.py density
+    python scripts/benchmarks.py anchors
+    python scripts/benchmarks.py nearest
+    python scripts/benchmarks.py aliases
+    python scripts/benchmarks.py record [--count N]      # needs the live sites
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = REPO_ROOT / "tests" / "fixtures"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def timed(fn, *args, repeat: int = 5):
+    """Best-of-`repeat` wall time in ms, plus the last result."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def load_fixtures(kind: str, paths: list[str]) -> list[tuple[str, str]]:
+    """(name, text) for each fixture file given, else everything recorded for `kind`."""
+    files = [Path(p) for p in paths] or sorted((FIXTURES / kind).glob("*.html"))
+    if not files:
+        print(f"  no recorded pages in {(FIXTURES / kind).relative_to(REPO_ROOT)} - using synthetic ones")
+    return [(f.name, f.read_text(encoding="utf-8", errors="replace")) for f in files]
+
+
+def report(label: str, ref_ms: float, new_ms: float) -> None:
+    speedup = ref_ms / new_ms if new_ms else float("inf")
+    print(f"  {label:<32} reference {ref_ms:9.2f} ms   current {new_ms:9.2f} ms   x{speedup:.1f}")
+
+
+# ------------------------------------------------------------- offer urls ----
+
+def reference_extract_offer_urls(html_content: str) -> set[str]:
+    """scraper.extract_offer_urls as it was: full BeautifulSoup tree, two scans."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    offer_pattern = r"https?://offers\.greatclips\.com/[A-Za-z0-9]+"
+    offer_urls = set()
+    for link in soup.find_all("a", href=True):
+        href = link.get("href", "")
+        if "offers.greatclips.com" in href:
+            offer_urls.update(re.findall(offer_pattern, href))
+        if "l.php" in href or "lm.facebook.com" in href:
+            offer_urls.update(re.findall(offer_pattern, urllib.parse.unquote(href)))
+    offer_urls.update(re.findall(offer_pattern, str(soup)))
+    return {u.split("?")[0].split("&")[0].split("#")[0] for u in offer_urls}
+
+
+def synthetic_ad_feed(ads: int = 3000) -> str:
+    """An Ad Library-shaped page: mostly markup noise, some redirect links, some JSON."""
+    rows = []
+    for i in range(ads):
+        code = f"Bench{i:05d}"
+        target = urllib.parse.quote(f"https://offers.greatclips.com/{code}?utm_source=fb", safe="")
+        rows.append(
+            f'<div class="x1 x2 x3"><span>Sponsored</span><div class="ad">'
+            f'<a href="https://l.facebook.com/l.php?u={target}&amp;h=AT0">Get offer</a>'
+            f'<img src="https://scontent.xx.fbcdn.net/{i}.jpg"></div></div>'
+        )
+        if i % 3 == 0:
+            rows.append(
+                f'<script type="application/json">{{"link_url":"https://offers.greatclips.com/{code}"}}</script>'
+            )
+    return "<html><body>" + "\n".join(rows) + "</body></html>"
+
+
+def bench_offer_urls(args) -> int:
+    import scraper
+
+    fixtures = load_fixtures("ad_library", args.files) or [("synthetic", synthetic_ad_feed())]
+    ok = True
+    for name, text in fixtures:
+        ref_ms, ref = timed(reference_extract_offer_urls, text, repeat=args.repeat)
+        new_ms, new = timed(lambda t: set(scraper.iter_offer_urls(t)), text, repeat=args.repeat)
+        report(f"{name} ({len(text) / 1_048_576:.1f} MB)", ref_ms, new_ms)
+        if not ref <= new:
+            ok = False
+            print(f"    MISSED by current: {sorted(ref - new)[:10]}")
+        if new - ref:
+            # JSON-escaped links the old regex could not see; expected, not an error.
+            print(f"    extra found by current: {len(new - ref)}")
+    return 0 if ok else 1
+
+
+# ------------------------------------------------------------ offer pages ----
+
+def reference_parse_offer_page(page_html: str) -> dict:
+    """scraper's offer-page parse as it was: a BeautifulSoup tree plus raw-HTML regexes."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    parts = []
+    for selector in ("#description", "#terms_and_conditions"):
+        node = soup.select_one(selector)
+        if node:
+            text = node.get_text(" ", strip=True)
+            if text:
+                parts.append(text)
+    visible_text = " ".join(parts).strip()
+    if not visible_text:
+        visible_text = soup.get_text(" ", strip=True)
+
+    image_url = None
+    og_image = re.search(r'<meta[^>]*property=["\']og:image["\'][^>]*content=["\']([^"\']+)["\']', page_html, re.IGNORECASE)
+    if not og_image:
+        og_image = re.search(r'<meta[^>]*content=["\']([^"\']+)["\'][^>]*property=["\']og:image["\']', page_html, re.IGNORECASE)
+    if og_image:
+        image_url = og_image.group(1)
+    else:
+        img_match = re.search(r'<img[^>]*src=["\']([^"\']*(?:coupon|offer|haircut)[^"\']*)["\']', page_html, re.IGNORECASE)
+        if img_match:
+            image_url = img_match.group(1)
+
+    price_match = re.search(r"\$(\d+\.?\d{0,2})", visible_text)
+    return {
+        "text": visible_text,
+        "image_url": image_url,
+        "price": "$" + price_match.group(1) if price_match else None,
+    }
+
+
+def synthetic_offer_pages() -> list[tuple[str, str]]:
+    """Offer pages in the shapes the scraper meets: live, ended, image-only, bare."""
+    head = (
+        '<!DOCTYPE html><html><head><title>Great Clips Offer</title>'
+        '<meta property="og:title" content="Great Clips">{meta}'
+        '<script>var t = "This offer has ended";</script><style>.x{{color:red}}</style></head>'
+    )
+    body = (
+        '<body><div class="hidden" id="ended">We&#39;re sorry! This offer has ended.</div>'
+        '<main><div id="description"><h1>$8.99 Haircut</h1><p>Save on your next '
+        'haircut<br>at Great Clips.</p></div>'
+        '<section id="terms_and_conditions"><p>Valid at participating Chicagoland '
+        'area Great Clips salons. <b>Expires 09/30/2026.</b> Limit one per '
+        'customer.</p><ul><li>Not valid with other offers</li></ul></section>'
+        '<img src="https://cdn.example.com/uploads/coupon-899.jpg" alt=""></main>'
+        '<footer>&copy; Great Clips, Inc.</footer></body></html>'
+    )
+    og = '<meta property="og:image" content="https://cdn.example.com/og/899.jpg">'
+    og_reversed = '<meta content="https://cdn.example.com/og/rev.jpg" property="og:image">'
+    bare = "<html><body><p>Valid at all Great Clips salons for $5.00 off.</p></body></html>"
+    # The description is never closed; </main> closes it, so the ended-offer
+    # footer is not part of it
+    unclosed = (
+        '<html><body><main><div id="description"><p>$8.99 haircut</main>'
+        "<footer>This offer has ended. Call $1.00</footer></body></html>"
+    )
+    return [
+        ("synthetic-og", head.format(meta=og) + body),
+        ("synthetic-og-reversed", head.format(meta=og_reversed) + body),
+        ("synthetic-img-only", head.format(meta="") + body),
+        ("synthetic-bare", bare),
+        ("synthetic-unclosed-section", unclosed),
+    ]
+
+
+def bench_offer_pages(args) -> int:
+    import scraper
+
+    fixtures = load_fixtures("offer_pages", args.files) or synthetic_offer_pages()
+    mismatches = 0
+    ref_total = new_total = 0.0
+    for name, text in fixtures:
+        ref_ms, ref = timed(reference_parse_offer_page, text, repeat=args.repeat)
+        new_ms, new = timed(scraper.parse_offer_page, text, repeat=args.repeat)
+        ref_total += ref_ms
+        new_total += new_ms
+        for field in ("text", "image_url", "price"):
+            if ref[field] != new.get(field):
+                mismatches += 1
+                print(f"  MISMATCH {name} {field}:\n    reference: {ref[field]!r}\n    current:   {new.get(field)!r}")
+    report(f"{len(fixtures)} page(s)", ref_total, new_total)
+    print(f"  field mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ------------------------------------------------------------ offer rules ----
+
+def reference_classify_offer_text(page_text: str) -> tuple[str, dict]:
+    """fetch_offer_details' inline if/elif chain as it was, minus the logging and LLM call."""
+    if "this offer has ended" in page_text.lower():
+        return "ended", {}
+    coupon = {}
+    valid_match = re.search(
+        r"(Valid at Great Clips\s+.+?Expires\s+\d{1,2}/\d{1,2}/\d{4})", page_text, re.IGNORECASE | re.DOTALL
+    )
+    if valid_match:
+        valid_text = re.sub(r"\s+", " ", valid_match.group(1).strip())
+        coupon["valid_text"] = valid_text
+        full_match = re.search(
+            r"Valid (?:at Great Clips|only at)\s+(.+?)\s+at\s+(.+?)\s+in\s+(.+?)\s+([A-Z]{2})[\.\s]", valid_text
+        )
+        if full_match:
+            coupon["location_name"] = full_match.group(1).strip()
+            coupon["address"] = full_match.group(2).strip()
+            coupon["city"] = full_match.group(3).strip()
+            coupon["state"] = full_match.group(4).strip()
+        exp_match = re.search(r"Expires\s+(\d{1,2}/\d{1,2}/\d{4})", valid_text)
+        if exp_match:
+            coupon["expiration"] = exp_match.group(1)
+        return "valid_text", coupon
+
+    us_wide_match = re.search(
+        r"(?:participating\s+US|all\s+US|any\s+(?:US\s+)?Great\s+Clips|"
+        r"all\s+Great\s+Clips\s+(?:locations?|salons?)|"
+        r"all\s+participating\s+(?:US\s+)?Great\s+Clips)",
+        page_text, re.IGNORECASE,
+    )
+    any_area_hint = re.search(
+        r"\b(?:area|region|metro)\b.{0,60}(?:Great\s+Clips|salons?|locations?)", page_text, re.IGNORECASE
+    )
+    area_match = re.search(
+        r"(?:participating|only at)\s+([A-Za-z\s]+?)\s+area\s+Great\s+Clips", page_text, re.IGNORECASE
+    )
+    area_fallback = re.search(
+        r"([A-Za-z][\w\s,\.&-]{2,60}?)\s+area\s+(?:Great\s+Clips\s+)?salons?", page_text, re.IGNORECASE
+    )
+    exp_match = re.search(r"Expires?\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})", page_text, re.IGNORECASE)
+    if exp_match:
+        coupon["expiration"] = exp_match.group(1)
+
+    if us_wide_match and not any_area_hint:
+        coupon["location_name"] = ""
+        coupon["state"] = "US"
+        return "us_wide", coupon
+    if area_match:
+        area_name = area_match.group(1).strip()
+        coupon.update(location_name=f"{area_name} Area", state="AREA", area_name=area_name)
+        return "area", coupon
+    if area_fallback:
+        area_name = area_fallback.group(1).strip()
+        if area_name.lower() not in {"the", "your", "local", "nearby", "this", "a", "an", "any"}:
+            coupon.update(location_name=f"{area_name} Area", state="AREA", area_name=area_name)
+            return "area_fallback", coupon
+    return "ambiguous", coupon
+
+
+def offer_rule_corpus(paths: list[str]) -> list[str]:
+    """Offer text to classify: recorded pages, else the synthetic ones, plus every
+    valid_text already in data/coupons.json."""
+    import scraper
+
+    fixtures = load_fixtures("offer_pages", paths) or synthetic_offer_pages()
+    texts = [scraper.parse_offer_page(html)["text"] for _, html in fixtures]
+    coupons_file = REPO_ROOT / "data" / "coupons.json"
+    if coupons_file.exists():
+        coupons = json.loads(coupons_file.read_text(encoding="utf-8")).get("coupons", [])
+        texts.extend(c["valid_text"] for c in coupons if c.get("valid_text"))
+    texts += [
+        "Valid at participating US Great Clips salons. Expires 12/31/2026.",
+        "Valid at participating Reno, Carson City & West NV area salons. Expires: 10/31/2026",
+        "Valid only at Great Clips in your area salons. Limit one.",
+        "Get $3 off your next haircut.",
+    ]
+    return texts
+
+
+def bench_offer_rules(args) -> int:
+    import offer_rules
+
+    texts = offer_rule_corpus(args.files)
+
+    def run_reference(items):
+        return [reference_classify_offer_text(t) for t in items]
+
+    def run_current(items):
+        return [offer_rules.classify_offer_text(t) for t in items]
+
+    ref_ms, ref = timed(run_reference, texts, repeat=args.repeat)
+    new_ms, new = timed(run_current, texts, repeat=args.repeat)
+    report(f"{len(texts)} text(s)", ref_ms, new_ms)
+
+    mismatches = 0
+    rules = {}
+    for text, (ref_rule, ref_fields), result in zip(texts, ref, new):
+        rules[result["rule"]] = rules.get(result["rule"], 0) + 1
+        # The shared engine knows every ended phrase; the old chain knew one.
+        if result["rule"] == offer_rules.RULE_ENDED and offer_rules.is_ended(text):
+            continue
+        if (ref_rule, ref_fields) != (result["rule"], result["fields"]):
+            mismatches += 1
+            print(f"  MISMATCH {text[:60]!r}:\n    reference: {ref_rule} {ref_fields}\n"
+                  f"    current:   {result['rule']} {result['fields']}")
+    print("  rules fired: " + ", ".join(f"{k} {v}" for k, v in sorted(rules.items())))
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ------------------------------------------------------------ salon parse ----
+
+def reference_parse_salon(path: str, html: str) -> dict | None:
+    """fetch_salons.parse_salon as it was: DOTALL regex over the page, json.loads
+    every JSON-LD block, then a second page-wide regex when geo is missing."""
+    import fetch_salons
+
+    blocks = []
+    for raw in re.findall(r'<script type="application/ld\+json">(.*?)</script>', html, re.S):
+        try:
+            parsed = json.loads(raw.strip())
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if isinstance(parsed, dict) and "@graph" in parsed:
+            blocks.extend(node for node in parsed["@graph"] if isinstance(node, dict))
+        elif isinstance(parsed, dict):
+            blocks.append(parsed)
+
+    business = next(
+        (
+            b
+            for b in blocks
+            if isinstance(b.get("address"), dict)
+            and b.get("@type") in ("HealthAndBeautyBusiness", "HairSalon", "LocalBusiness")
+        ),
+        None,
+    )
+    subject = next(
+        (
+            b.get("credentialSubject")
+            for b in blocks
+            if isinstance(b.get("credentialSubject"), dict)
+            and isinstance(b["credentialSubject"].get("address"), dict)
+        ),
+        None,
+    )
+
+    address = (business or {}).get("address") or (subject or {}).get("address")
+    if not address:
+        return None
+    city = (address.get("addressLocality") or "").strip()
+    state = (address.get("addressRegion") or "").strip().upper()
+    street = (address.get("streetAddress") or "").strip()
+    if not (city and state and street):
+        return None
+
+    lat = lng = None
+    geo = (subject or {}).get("geo") or {}
+    if isinstance(geo, dict):
+        try:
+            lat = round(float(geo["latitude"]), 6)
+            lng = round(float(geo["longitude"]), 6)
+        except (KeyError, TypeError, ValueError):
+            lat = lng = None
+    if lat is None:
+        m = re.search(r'"yextDisplayCoordinate":\{"latitude":([-\d.]+),"longitude":([-\d.]+)\}', html)
+        if m:
+            lat, lng = round(float(m.group(1)), 6), round(float(m.group(2)), 6)
+
+    phone = (business or {}).get("telephone") or ""
+    if not phone and subject:
+        digits = re.sub(r"\D", "", subject.get("telephone", ""))
+        if len(digits) == 11 and digits.startswith("1"):
+            digits = digits[1:]
+        if len(digits) == 10:
+            phone = f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    phone = phone.strip()
+
+    hours = {
+        day: fetch_salons._pretty_range(rng)
+        for day, rng in fetch_salons._normalize_hours((business or {}).get("openingHours")).items()
+    }
+    parts = path.split("/")
+    return {
+        "path": path,
+        "url": fetch_salons.BASE + path,
+        "country": parts[0].upper() if parts else "US",
+        "street": street,
+        "city": city,
+        "state": state,
+        "zip": (address.get("postalCode") or "").strip(),
+        "phone": phone,
+        "lat": lat,
+        "lng": lng,
+        "hours": hours,
+    }
+
+
+def synthetic_salon_pages() -> list[tuple[str, str]]:
+    """Locator-shaped salon pages: markup noise around breadcrumb, business and
+    Yext blocks; one with geo only in the display-coordinate blob, one with nothing."""
+    address = {
+        "@type": "PostalAddress",
+        "streetAddress": "1109 S Roselle Rd",
+        "addressLocality": "Schaumburg",
+        "addressRegion": "IL",
+        "postalCode": "60193",
+    }
+    business = {
+        "@context": "https://schema.org",
+        "@type": "HealthAndBeautyBusiness",
+        "name": "Great Clips",
+        "address": address,
+        "telephone": "(847) 555-0100",
+        "openingHours": ["Mo,Tu,We,Th,Fr 09:00-20:00", "Sa 09:00-18:00", "Su 10:00-17:00"],
+    }
+    breadcrumbs = {
+        "@type": "BreadcrumbList",
+        "itemListElement": [{"@type": "ListItem", "position": i, "name": f"Level {i}"} for i in range(1, 5)],
+    }
+    yext = {
+        "@type": "VerifiableCredential",
+        "credentialSubject": {
+            "address": address,
+            "telephone": "+18475550100",
+            "geo": {"latitude": 42.0145, "longitude": -88.0801},
+        },
+    }
+    yext_no_geo = {"@type": "VerifiableCredential", "credentialSubject": {"address": address, "telephone": "+18475550100"}}
+    noise = "".join(
+        f'<div class="c-hours-row"><span class="c-day">{d}</span><span class="c-time">9:00 AM</span></div>'
+        for d in range(400)
+    )
+
+    def page(*blocks, extra=""):
+        scripts = "".join(f'<script type="application/ld+json">{json.dumps(b)}</script>' for b in blocks)
+        return (
+            f"<!doctype html><html><head><title>Great Clips Schaumburg</title>{scripts}"
+            f'<script>window.config = {{"locale": "en"}};</script></head>'
+            f"<body>{noise}{extra}<footer>&copy; Great Clips</footer></body></html>"
+        )
+
+    coord = '<script>var data = {"yextDisplayCoordinate":{"latitude":42.0145,"longitude":-88.0801}};</script>'
+    return [
+        ("synthetic-full", page(breadcrumbs, business, yext)),
+        ("synthetic-graph", page({"@context": "https://schema.org", "@graph": [breadcrumbs, business, yext]})),
+        ("synthetic-coordinate-only", page(breadcrumbs, business, yext_no_geo, extra=coord)),
+        ("synthetic-no-address", page(breadcrumbs)),
+    ]
+
+
+def bench_salon_parse(args) -> int:
+    import fetch_salons
+
+    fixtures = load_fixtures("salon_pages", args.files) or synthetic_salon_pages()
+    path = "us/il/schaumburg/1109-s-roselle-rd"
+
+    def run_reference(items):
+        return [reference_parse_salon(path, html) for _, html in items]
+
+    def run_current(items):
+        return [fetch_salons.parse_salon(path, html) for _, html in items]
+
+    ref_ms, ref = timed(run_reference, fixtures, repeat=args.repeat)
+    new_ms, new = timed(run_current, fixtures, repeat=args.repeat)
+    decoder = "orjson" if fetch_salons.orjson is not None else "json"
+    report(f"{len(fixtures)} page(s), {decoder}", ref_ms, new_ms)
+
+    mismatches = 0
+    for (name, _), a, b in zip(fixtures, ref, new):
+        if a != b:
+            mismatches += 1
+            print(f"  MISMATCH {name}:\n    reference: {a}\n    current:   {b}")
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ---------------------------------------------------------------- density ----
+
+def bench_density(args) -> int:
+    import copy
+
+    import markets
+
+    if markets.np is None:
+        print("  numpy is not installed - only the scalar path can run")
+        return 1
+    cities = markets.build_cities(markets.load_salons(columns=()))
+
+    def run(use_numpy, model):
+        metros = markets.build_metros(model, use_numpy=use_numpy)
+        return model, metros
+
+    def density(use_numpy):
+        markets.compute_density(cities, use_numpy=use_numpy)
+        return {key: city["density"] for key, city in cities.items()}
+
+    ref_ms, ref_cities = timed(density, False, repeat=args.repeat)
+    new_ms, new_cities = timed(density, True, repeat=args.repeat)
+    report(f"compute_density, {len(cities)} cities", ref_ms, new_ms)
+    # build_metros writes into the cities it is given; copy them outside the timing
+    ref_ms, (ref_model, ref_metros) = timed(run, False, copy.deepcopy(cities), repeat=1)
+    new_ms, (new_model, new_metros) = timed(run, True, copy.deepcopy(cities), repeat=1)
+    report("build_metros", ref_ms, new_ms)
+
+    mismatches = 0
+    for key, value in ref_cities.items():
+        if value != new_cities[key]:
+            mismatches += 1
+            print(f"  MISMATCH density {key}: {value} != {new_cities[key]}")
+    for key, city in ref_model.items():
+        got = new_model[key]
+        if (city.get("metro_key"), city.get("metro_distance_mi")) != (got.get("metro_key"), got.get("metro_distance_mi")):
+            mismatches += 1
+            print(f"  MISMATCH metro {key}: {city.get('metro_key')} != {got.get('metro_key')}")
+    if ref_metros != new_metros:
+        mismatches += 1
+        print("  MISMATCH metros differ")
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ---------------------------------------------------------------- anchors ----
+
+def reference_select_anchors(ordered: list[dict]) -> list[dict]:
+    """build_metros' anchor selection as it was: every city against every anchor so far."""
+    import markets
+
+    anchors: list[dict] = []
+    for city in ordered:
+        covered = any(
+            markets.haversine_mi(city["lat"], city["lng"], a["lat"], a["lng"])
+            <= markets.reach_for(a["density"])
+            for a in anchors
+        )
+        if not covered:
+            anchors.append(city)
+    return anchors
+
+
+def bench_anchors(args) -> int:
+    import markets
+
+    cities = markets.build_cities(markets.load_salons(columns=()))
+    markets.compute_density(cities)
+    geo = [c for c in cities.values() if c["lat"] is not None]
+    ordered = sorted(geo, key=lambda c: (-c["density"], -c["salon_count"], c["state"], c["city"]))
+
+    ref_ms, ref = timed(reference_select_anchors, ordered, repeat=args.repeat)
+    new_ms, new = timed(markets._select_anchors, ordered, repeat=args.repeat)
+    report(f"{len(ordered)} cities -> {len(new)} anchors", ref_ms, new_ms)
+
+    # Same anchors in the same order means the same metros and data/metros.json
+    ref_keys = [c["key"] for c in ref]
+    new_keys = [c["key"] for c in new]
+    mismatches = 0
+    if ref_keys != new_keys:
+        mismatches = len(set(ref_keys) ^ set(new_keys)) or 1
+        print(f"  MISMATCH anchors: {sorted(set(ref_keys) ^ set(new_keys))[:10]}")
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ---------------------------------------------------------------- nearest ----
+
+def reference_nearest_cities(city: dict, cities: dict, limit: int, max_mi: float) -> list[dict]:
+    """markets.nearest_cities as it was: measure every city in the country."""
+    import markets
+
+    out = []
+    for other in cities.values():
+        if other["key"] == city["key"] or other["lat"] is None:
+            continue
+        d = markets.haversine_mi(city["lat"], city["lng"], other["lat"], other["lng"])
+        if d <= max_mi:
+            out.append({"city": other, "distance_mi": round(d, 1)})
+    out.sort(key=lambda r: r["distance_mi"])
+    return out[:limit]
+
+
+def bench_nearest(args) -> int:
+    import markets
+
+    cities, _ = markets.build_all(columns=())
+    geo = [c for c in cities.values() if c["lat"] is not None]
+
+    def run(fn):
+        # What generate_local_pages asks for on every city page
+        return [[(r["city"]["key"], r["distance_mi"]) for r in fn(c, cities, 10, 40.0)] for c in geo]
+
+    ref_ms, ref = timed(run, reference_nearest_cities, repeat=args.repeat)
+    markets._CITY_INDEX = None  # include building the index in the timing
+    new_ms, new = timed(run, markets.nearest_cities, repeat=args.repeat)
+    report(f"{len(geo)} city pages", ref_ms, new_ms)
+
+    mismatches = sum(1 for a, b in zip(ref, new) if a != b)
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ---------------------------------------------------------------- aliases ----
+
+def reference_contained_aliases(norm: str) -> list[str]:
+    """The alias scan resolve_area used to do: one regex per AREA_ALIASES key."""
+    import markets
+
+    return sorted(
+        (key for key in markets.AREA_ALIASES if re.search(rf"\b{re.escape(key)}\b", norm)),
+        key=len,
+        reverse=True,
+    )
+
+
+def alias_corpus() -> list[str]:
+    """Normalized place-name tokens, as resolve_area sees them, from every market
+    string in data/coupons.json plus a few that exercise overlapping aliases."""
+    import markets
+
+    areas = []
+    coupons_file = REPO_ROOT / "data" / "coupons.json"
+    if coupons_file.exists():
+        coupons = json.loads(coupons_file.read_text(encoding="utf-8")).get("coupons", [])
+        for c in coupons:
+            areas.extend(v for v in (c.get("area_name"), c.get("market")) if v)
+    areas += [
+        "participating San Francisco Bay Area salons",
+        "DFW Metroplex",
+        "Chicagoland Suburbs & Northwest Indiana",
+        "Dallas-Fort Worth, North Texas",
+        "Greater Sioux Falls / Siouxland",
+        "Twin Cities Metro",
+    ]
+    return [markets.normalize_city(t) for area in areas for t in markets._candidate_tokens(area)]
+
+
+def bench_aliases(args) -> int:
+    import markets
+
+    tokens = alias_corpus()
+
+    def run(fn, items):
+        return [fn(t) for t in items]
+
+    ref_ms, ref = timed(run, reference_contained_aliases, tokens, repeat=args.repeat)
+    new_ms, new = timed(run, markets.contained_aliases, tokens, repeat=args.repeat)
+    report(f"{len(tokens)} market token(s)", ref_ms, new_ms)
+
+    mismatches = 0
+    for token, a, b in zip(tokens, ref, new):
+        if a != b:
+            mismatches += 1
+            print(f"  MISMATCH {token!r}: reference {a} current {b}")
+    print(f"  aliases found: {sum(map(len, new))}")
+    print(f"  mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+# ----------------------------------------------------------------- record ----
+
+def record_fixtures(args) -> int:
+    """Save live offer pages (from data/coupons.json) and salon pages (from
+    data/salons.json, spread across the list) under tests/fixtures."""
+    import fetch_salons
+    import scraper
+
+    with open(scraper.JSON_FILE, encoding="utf-8") as fh:
+        offer_urls = [c["url"] for c in json.load(fh).get("coupons", []) if c.get("url")]
+    with open(REPO_ROOT / "data" / "salons.json", encoding="utf-8") as fh:
+        salons = json.load(fh).get("salons", [])
+    step = max(1, len(salons) // max(1, args.count))
+    salon_urls = [s["url"] for s in salons[::step] if s.get("url")]
+
+    session = fetch_salons.make_session()
+    failed = 0
+    for kind, urls, fetch in (
+        ("offer_pages", offer_urls, scraper.fetch_html),
+        ("salon_pages", salon_urls, lambda url: fetch_salons.get(session, url)),
+    ):
+        out = FIXTURES / kind
+        out.mkdir(parents=True, exist_ok=True)
+        saved = 0
+        for url in urls:
+            if saved >= args.count:
+                break
+            html = fetch(url)
+            if not html:
+                failed += 1
+                print(f"  ! could not fetch {url}")
+                continue
+            name = urllib.parse.urlsplit(url).path.strip("/").replace("/", "_") + ".html"
+            (out / name).write_text(html, encoding="utf-8")
+            saved += 1
+        print(f"  {kind}: saved {saved} page(s) to {out.relative_to(REPO_ROOT)}")
+    return 0 if not failed else 1
+
+
+# ------------------------------------------------------------------- main ----
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5, help="runs per timing (best is kept)")
+    sub = ap.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("offer-urls", help="extract_offer_urls: BeautifulSoup vs streaming regex")
+    p.add_argument("files", nargs="*", help="saved Ad Library pages")
+    p.set_defaults(func=bench_offer_urls)
+
+    p = sub.add_parser("offer-pages", help="offer-page parse: BeautifulSoup vs single-pass tokenizer")
+    p.add_argument("files", nargs="*", help="saved offer pages")
+    p.set_defaults(func=bench_offer_pages)
+
+    p = sub.add_parser("offer-rules", help="offer-text classification: inline regexes vs offer_rules")
+    p.add_argument("files", nargs="*", help="saved offer pages")
+    p.set_defaults(func=bench_offer_rules)
+
+    p = sub.add_parser("salon-parse", help="fetch_salons.parse_salon: page-wide regexes vs targeted JSON-LD scan")
+    p.add_argument("files", nargs="*", help="saved salon locator pages")
+    p.set_defaults(func=bench_salon_parse)
+
+    p = sub.add_parser("density", help="markets density/metro assignment: per-pair loops vs NumPy batches")
+    p.set_defaults(func=bench_density)
+
+    p = sub.add_parser("anchors", help="markets anchor selection: all anchors vs incremental grid")
+    p.set_defaults(func=bench_anchors)
+
+    p = sub.add_parser("nearest", help="markets.nearest_cities: full scan vs CityIndex grid")
+    p.set_defaults(func=bench_nearest)
+
+    p = sub.add_parser("aliases", help="markets.contained_aliases: regex per alias vs word trie")
+    p.set_defaults(func=bench_aliases)
+
+    p = sub.add_parser("record", help="save live offer and salon pages under tests/fixtures")
+    p.add_argument("--count", type=int, default=8, help="pages per kind")
+    p.set_defaults(func=record_fixtures)
+
+    args = ap.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
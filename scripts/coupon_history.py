@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Append-only coupon history, and the per-state stats computed from it.
+
+data/coupons.json only holds what is live right now - expired offers are dropped
+on every scrape. This keeps the long view as a change log: each scrape appends
+one compact JSON line per coupon it added or changed (or that the history has
+not seen yet, so the first scrape seeds it with everything live), and an "ended"
+line per coupon that expired or was pulled, to a monthly segment,
+
+    data/history/2026-10.jsonl
+
+and nothing is ever rewritten. A scrape that changed nothing writes nothing. A
+segment is named after the month it covers, so a query for a period only opens
+the months inside it (and the ones before, for coupons still live from then).
+
+The stats behind data/state_history_stats.json ("unique coupons", median and
+lowest price per state) are recomputed from the history in one pass: index every
+observation by coupon key, keep the latest sighting of each coupon that was
+still live in the period, then resolve each to the states it reaches with the
+same market model the city pages use (markets.coupon_market_keys).
+
+Usage:
+    python scripts/coupon_history.py record                  # append all of data/coupons.json as one run
+    python scripts/coupon_history.py stats                   # print per-state stats
+    python scripts/coupon_history.py stats --since 2025-12-30 --write
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_DIR = REPO_ROOT / "data" / "history"
+COUPONS_FILE = REPO_ROOT / "data" / "coupons.json"
+STATS_FILE = REPO_ROOT / "data" / "state_history_stats.json"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(REPO_ROOT))
+
+import atomic_write  # noqa: E402
+import markets  # noqa: E402
+
+# Fields kept per observation; empty values are left out to keep lines short.
+OBSERVED_FIELDS = (
+    "coupon_code",
+    "url",
+    "price",
+    "state",
+    "area_name",
+    "market",
+    "location_name",
+    "city",
+    "address",
+    "expiration",
+    "manual_add",
+)
+
+_SEGMENT_RE = re.compile(r"^(\d{4}-\d{2})\.jsonl$")
+_PRICE_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+# ------------------------------------------------------------------ store ---
+
+def coupon_key(coupon: dict) -> str:
+    """Offer code when there is one, else the URL - stable across runs."""
+    return coupon.get("coupon_code") or coupon.get("url") or ""
+
+
+def append_run(
+    coupons: list[dict], observed_at: datetime | None = None, ended: list[dict] = ()
+) -> Path | None:
+    """Append one observation per coupon, and an "ended" line per coupon in
+    `ended`, to this month's segment. Returns the segment, or None if nothing
+    was written."""
+    observed_at = observed_at or datetime.now()
+    run = observed_at.strftime("%Y-%m-%dT%H:%M:%S")
+    records = []
+    for coupon in coupons:
+        key = coupon_key(coupon)
+        if not key:
+            continue
+        record = {"run": run, "key": key}
+        record.update({f: coupon[f] for f in OBSERVED_FIELDS if coupon.get(f) not in (None, "", False)})
+        records.append(record)
+    records += [{"run": run, "key": key, "ended": True} for key in map(coupon_key, ended) if key]
+    if not records:
+        return None
+    lines = [json.dumps(r, separators=(",", ":"), ensure_ascii=False) + "\n" for r in records]
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    segment = HISTORY_DIR / f"{observed_at:%Y-%m}.jsonl"
+    with segment.open("a", encoding="utf-8") as fh:
+        fh.writelines(lines)
+    return segment
+
+
+def recorded_keys() -> set[str]:
+    """Every coupon key the history holds a line for."""
+    return {record["key"] for record in iter_observations() if record.get("key")}
+
+
+def segments(since: str | None = None, until: str | None = None) -> list[Path]:
+    """Segment files whose month overlaps [since, until] (YYYY-MM-DD), oldest first."""
+    if not HISTORY_DIR.is_dir():
+        return []
+    found = []
+    for path in HISTORY_DIR.iterdir():
+        match = _SEGMENT_RE.match(path.name)
+        if not match:
+            continue
+        month = match.group(1)
+        if since and month < since[:7]:
+            continue
+        if until and month > until[:7]:
+            continue
+        found.append(path)
+    return sorted(found)
+
+
+def iter_observations(since: str | None = None, until: str | None = None):
+    """Every observation recorded between `since` and `until` (inclusive dates)."""
+    for path in segments(since, until):
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a run killed mid-write; the rest of the segment is fine
+                day = record.get("run", "")[:10]
+                if since and day < since:
+                    continue
+                if until and day > until:
+                    continue
+                yield record
+
+
+# ------------------------------------------------------------------ query ---
+
+def price_value(coupon: dict) -> float | None:
+    match = _PRICE_RE.search((coupon.get("price") or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def latest_by_key(observations, since: str | None = None) -> tuple[dict[str, dict], str, str]:
+    """Index observations by coupon key, keeping the latest. Also returns the first/last run day.
+
+    Coupons whose newest line is an "ended" one from before `since` were gone
+    by then and are left out.
+    """
+    latest: dict[str, dict] = {}
+    ended: dict[str, str] = {}
+    first = last = ""
+    for record in observations:
+        run = record.get("run", "")
+        if not first or run < first:
+            first = run
+        if run > last:
+            last = run
+        key = record["key"]
+        if record.get("ended"):
+            ended[key] = max(run, ended.get(key, ""))
+            continue
+        previous = latest.get(key)
+        if previous is None or run >= previous.get("run", ""):
+            latest[key] = record
+    if since:
+        latest = {
+            key: record
+            for key, record in latest.items()
+            if not (ended.get(key, "") > record.get("run", "") and ended[key][:10] < since)
+        }
+    return latest, first[:10], last[:10]
+
+
+def coupon_states(coupon: dict, cities: dict, lookup: dict) -> list[str]:
+    """Two-letter codes of every state a coupon reaches; [] for national ones."""
+    resolved = markets.coupon_market_keys(coupon, cities, lookup)
+    scope = resolved["scope"]
+    if scope == "national":
+        return []
+    if scope == "state":
+        return list(resolved.get("states") or [resolved["state"]])
+    if resolved.get("city_keys"):
+        return sorted({key.split("/", 1)[0] for key in resolved["city_keys"]})
+    # Salons outside the market model (Canada, mostly) still carry their code.
+    state = (coupon.get("state") or "").strip().upper()
+    if len(state) == 2 and state.isalpha() and state != "US":
+        return [state]
+    return []
+
+
+def state_stats(since: str | None = None, until: str | None = None) -> dict:
+    """Per-state unique coupons, median and lowest price, over the period."""
+    # Same cleaning as the published feed (scripts/export_coupon_feed.py)
+    from generate_website import is_blocked_coupon, normalize_coupons
+
+    # Only changes are logged, so a coupon live in the period may last have been
+    # seen before it: read from the start and let latest_by_key drop the ended ones
+    latest, first, last = latest_by_key(iter_observations(None, until), since)
+    coupons = normalize_coupons([c for c in latest.values() if not is_blocked_coupon(c)])
+
+    cities, _ = markets.build_all(columns=())
+    lookup = markets.build_city_lookup(cities)
+
+    prices_by_state: dict[str, list[float]] = {}
+    for coupon in coupons:
+        price = price_value(coupon)
+        if price is None:
+            continue
+        for state in coupon_states(coupon, cities, lookup):
+            prices_by_state.setdefault(state, []).append(price)
+
+    states = {
+        state: {
+            "unique_coupons": len(prices),
+            "median_price": round(statistics.median(prices), 2),
+            "lowest_price": round(min(prices), 2),
+        }
+        for state, prices in sorted(prices_by_state.items(), key=lambda kv: (-len(kv[1]), kv[0]))
+    }
+    return {"period": f"{since or first} to {until or last}", "states": states}
+
+
+# ------------------------------------------------------------------- main ---
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("record", help="append the coupons in data/coupons.json as one run")
+
+    p = sub.add_parser("stats", help="recompute per-state stats from the history")
+    p.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    p.add_argument("--until", help="last day to include (YYYY-MM-DD)")
+    p.add_argument("--write", action="store_true", help=f"write {STATS_FILE.relative_to(REPO_ROOT)}")
+
+    args = ap.parse_args()
+
+    if args.command == "record":
+        with COUPONS_FILE.open(encoding="utf-8") as fh:
+            coupons = json.load(fh).get("coupons", [])
+        segment = append_run(coupons)
+        print(f"Recorded {len(coupons)} coupon(s) to {segment.relative_to(REPO_ROOT) if segment else 'nothing'}")
+        return 0
+
+    stats = state_stats(args.since, args.until)
+    if not stats["states"]:
+        print("No priced coupons in the history for that period.")
+        return 1
+    print(f"Period: {stats['period']}")
+    for state, row in stats["states"].items():
+        print(
+            f"  {state}  {row['unique_coupons']:>4} coupons   "
+            f"median ${row['median_price']:.2f}   lowest ${row['lowest_price']:.2f}"
+        )
+    if args.write:
+        if atomic_write.write_json(STATS_FILE, stats, indent=2):
+            print(f"Wrote {STATS_FILE.relative_to(REPO_ROOT)}")
+        else:
+            print(f"{STATS_FILE.relative_to(REPO_ROOT)} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,7 @@ REPO_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 sys.path.insert(0, str(REPO_ROOT))
 
+import atomic_write  # noqa: E402
 import markets  # noqa: E402
 
 # Reuse the homepage's own cleaning so the city pages and the homepage never
@@ -121,14 +122,14 @@ def build_feed(cities: dict, metros: dict) -> dict:
 
 
 def main() -> int:
-    cities, metros = markets.build_all()
+    cities, metros = markets.build_all(columns=())
     feed = build_feed(cities, metros)
 
-    FEED_OUT.parent.mkdir(parents=True, exist_ok=True)
-    with FEED_OUT.open("w", encoding="utf-8") as fh:
-        json.dump(feed, fh, indent=1, ensure_ascii=False)
-
-    print(f"Wrote {FEED_OUT.relative_to(REPO_ROOT)}  ({len(feed['coupons'])} coupons)")
+    # generated_at alone changing is not worth a commit (or a Pages deploy)
+    if atomic_write.write_json(FEED_OUT, feed, volatile=("generated_at",), indent=1, ensure_ascii=False):
+        print(f"Wrote {FEED_OUT.relative_to(REPO_ROOT)}  ({len(feed['coupons'])} coupons)")
+    else:
+        print(f"{FEED_OUT.relative_to(REPO_ROOT)} unchanged  ({len(feed['coupons'])} coupons)")
     for scope, count in sorted(feed["scopes"].items(), key=lambda kv: -kv[1]):
         print(f"  {scope:<9} {count}")
     return 0
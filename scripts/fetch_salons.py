@@ -10,39 +10,69 @@ Each salon detail page carries JSON-LD (HealthAndBeautyBusiness) with the full
 street address, city, state, ZIP, phone and opening hours, plus a Yext
 "certified fact" block with lat/lng. We keep only those facts.
 
-Writes data/salons.json. Resumable: extracted records are appended to a JSONL
+Writes data/salons.json. Resumable: extracted records are kept in a SQLite
 cache, so re-running after an interruption only fetches what is missing.
+Incremental: each cached record keeps the sitemap <lastmod> it was fetched at,
+and a refresh refetches only salons whose lastmod moved. Salons gone from the
+sitemap are dropped. A routine refresh costs a few dozen requests, not 4,300.
 
 Usage:
     python scripts/fetch_salons.py                # full refresh (uses cache)
     python scripts/fetch_salons.py --limit 50     # smoke test
     python scripts/fetch_salons.py --no-cache     # ignore cache, refetch all
+    python scripts/fetch_salons.py --async        # asyncio crawler (HTTP/2 with httpx)
+
+GC_SALONS_BASE points the crawler at another host - a local fixture server,
+say - instead of salons.greatclips.com.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import importlib.util
 import json
 import os
+import random
 import re
+import sqlite3
 import sys
 import threading
 import time
+import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
 import requests
+import urllib3
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-SITEMAP_INDEX = "https://salons.greatclips.com/sitemap.xml"
-BASE = "https://salons.greatclips.com/"
+import atomic_write
+import salon_changes
+import salon_hours
+import salon_store
+
+BASE = os.environ.get("GC_SALONS_BASE", "https://salons.greatclips.com/").rstrip("/") + "/"
+SITEMAP_INDEX = BASE + "sitemap.xml"
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 OUT_FILE = REPO_ROOT / "data" / "salons.json"
 CACHE_DIR = Path(
     os.environ.get("GC_CACHE_DIR", REPO_ROOT / ".cache" / "salons")
 )
-CACHE_FILE = CACHE_DIR / "salons.jsonl"
+CACHE_DB = CACHE_DIR / "salons.sqlite3"
+LEGACY_CACHE_FILE = CACHE_DIR / "salons.jsonl"  # migrated into CACHE_DB on first use
+CACHE_ONLY_FIELDS = ("lastmod",)
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -51,6 +81,10 @@ USER_AGENT = (
 WORKERS = int(os.environ.get("GC_WORKERS", "12"))
 TIMEOUT = 30
 RETRIES = 3
+# Retry waits are "full jitter": uniform in [0, min(cap, base * 2**attempt)], so
+# workers that failed together do not all come back together.
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
 
 DAY_ORDER = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
 DAY_FULL = {
@@ -64,7 +98,6 @@ DAY_FULL = {
 }
 
 _print_lock = threading.Lock()
-_cache_lock = threading.Lock()
 
 
 def log(msg: str) -> None:
@@ -78,9 +111,20 @@ def make_session() -> requests.Session:
     return s
 
 
+def backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before retrying; honours a Retry-After given in seconds."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
 def get(session: requests.Session, url: str) -> str | None:
-    """GET with retries and linear backoff. Returns text or None."""
+    """GET with retries and jittered exponential backoff. Returns text or None."""
     for attempt in range(RETRIES):
+        retry_after = None
         try:
             r = session.get(url, timeout=TIMEOUT)
             if r.status_code == 200:
@@ -88,36 +132,24 @@ def get(session: requests.Session, url: str) -> str | None:
             if r.status_code in (404, 410):
                 return None
             # 429/5xx -> back off
+            retry_after = r.headers.get("Retry-After")
         except requests.RequestException:
             pass
-        time.sleep(1.5 * (attempt + 1))
+        if attempt + 1 < RETRIES:
+            time.sleep(backoff_delay(attempt, retry_after))
     return None
 
 
 # ---------------------------------------------------------------- sitemap ----
 
-def fetch_sitemap_paths(session: requests.Session) -> list[str]:
-    """Return every site-relative path from the locator's sitemap index."""
-    index = get(session, SITEMAP_INDEX)
-    if not index:
-        raise SystemExit("Could not fetch the Great Clips locator sitemap index")
+# Child sitemaps are fetched on a thread pool and parsed as they stream in with
+# iterparse; each <url> is classified into the salon or city set as soon as it
+# closes and is then dropped from the tree, so memory holds the two path sets
+# and nothing of the XML.
 
-    children = re.findall(r"<loc>\s*([^<\s]+)\s*</loc>", index)
-    paths: list[str] = []
-    for child in children:
-        body = get(session, child)
-        if not body:
-            log(f"  ! could not fetch {child}")
-            continue
-        locs = re.findall(r"<loc>\s*([^<\s]+)\s*</loc>", body)
-        for loc in locs:
-            paths.append(loc.replace(BASE, "").strip("/"))
-        log(f"  {child.rsplit('/', 1)[-1]}: {len(locs):,} urls")
-    return paths
 
-
-def split_paths(paths: list[str]) -> tuple[list[str], list[str]]:
-    """Split locator paths into (salon detail paths, city directory paths).
+class SitemapPaths:
+    """Salon detail paths (with their newest <lastmod>) and city directory paths.
 
     Salon pages are us/<st>/<city>/<street>. Street slugs can themselves contain
     slashes ("2506-1/2-n-clark-st", "422-us-hwy-202/206-n"), which show up as
@@ -125,41 +157,206 @@ def split_paths(paths: list[str]) -> tuple[list[str], list[str]]:
     /salon-services. So: treat "<...>/salon-services" as the canonical marker of
     a salon page and derive the detail path by stripping that suffix.
     """
-    salons: set[str] = set()
-    cities: set[str] = set()
 
-    for p in paths:
-        if not p or "." in p.split("/")[-1]:
-            continue
-        parts = p.split("/")
-        if parts[-1] == "salon-services":
-            salons.add("/".join(parts[:-1]))
-        elif len(parts) == 3:
-            cities.add(p)
-        elif len(parts) >= 4:
-            salons.add(p)
+    def __init__(self) -> None:
+        self.salons: dict[str, str | None] = {}
+        self.cities: set[str] = set()
+        # Child sitemaps that could not be read to the end: the sets then miss
+        # salons that still exist
+        self.failed: set[str] = set()
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed
+
+    def add(self, path: str, lastmod: str | None = None) -> None:
+        salon = salon_path(path)
+        if salon:
+            if lastmod and lastmod > (self.salons.get(salon) or ""):
+                self.salons[salon] = lastmod
+            else:
+                self.salons.setdefault(salon, None)
+        elif path and len(path.split("/")) == 3 and "." not in path.split("/")[-1]:
+            self.cities.add(path)
+
+    def update(self, other: "SitemapPaths") -> None:
+        for salon, lastmod in other.salons.items():
+            if lastmod and lastmod > (self.salons.get(salon) or ""):
+                self.salons[salon] = lastmod
+            else:
+                self.salons.setdefault(salon, None)
+        self.cities |= other.cities
+        self.failed |= other.failed
+
+    def salon_paths(self) -> list[str]:
+        return sorted(self.salons)
+
+    def city_paths(self) -> list[str]:
+        return sorted(self.cities)
+
+    def lastmods(self) -> dict[str, str]:
+        """Salon detail path -> newest <lastmod> among its sitemap entries."""
+        return {p: lastmod for p, lastmod in self.salons.items() if lastmod}
+
+
+def salon_path(path: str) -> str | None:
+    """The salon detail path a locator path belongs to, or None (see SitemapPaths)."""
+    if not path or "." in path.split("/")[-1]:
+        return None
+    parts = path.split("/")
+    if parts[-1] == "salon-services":
+        return "/".join(parts[:-1])
+    if len(parts) >= 4:
+        return path
+    return None
+
 
-    return sorted(salons), sorted(cities)
+class SitemapUnavailable(Exception):
+    """A sitemap could not be read to the end, even after retries."""
+
+
+def iter_sitemap(session: requests.Session, url: str):
+    """Yield (loc, lastmod) for each <url> or <sitemap> entry, parsed as it downloads.
+
+    Retries like get(); a retry skips the entries an attempt before it already
+    yielded. Raises SitemapUnavailable when the sitemap is missing or every
+    attempt broke off.
+    """
+    yielded: set[str] = set()
+    for attempt in range(RETRIES):
+        retry_after = None
+        try:
+            with session.get(url, timeout=TIMEOUT, stream=True) as r:
+                if r.status_code in (404, 410):
+                    break
+                if r.status_code == 200:
+                    # iterparse reads r.raw, so a connection cut mid-body surfaces
+                    # as a urllib3 error rather than a requests one
+                    r.raw.decode_content = True
+                    root = None
+                    loc = lastmod = None
+                    for event, elem in ET.iterparse(r.raw, events=("start", "end")):
+                        if root is None:
+                            root = elem
+                        if event != "end":
+                            continue
+                        tag = elem.tag.rpartition("}")[2]
+                        if tag == "loc":
+                            loc = (elem.text or "").strip()
+                        elif tag == "lastmod":
+                            lastmod = (elem.text or "").strip() or None
+                        elif tag in ("url", "sitemap"):
+                            if loc and loc not in yielded:
+                                yielded.add(loc)
+                                yield loc, lastmod
+                            loc = lastmod = None
+                            root.clear()
+                    return
+                retry_after = r.headers.get("Retry-After")
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError, ET.ParseError):
+            pass
+        if attempt + 1 < RETRIES:
+            time.sleep(backoff_delay(attempt, retry_after))
+    log(f"  ! could not fetch {url}")
+    raise SitemapUnavailable(url)
+
+
+def fetch_sitemap_paths(session: requests.Session) -> SitemapPaths:
+    """Every salon and city page in the locator's sitemap index."""
+    try:
+        children = list(dict.fromkeys(loc for loc, _ in iter_sitemap(session, SITEMAP_INDEX)))
+    except SitemapUnavailable:
+        children = []
+    if not children:
+        raise SystemExit("Could not fetch the Great Clips locator sitemap index")
+
+    def read_child(child: str) -> tuple[str, int, SitemapPaths]:
+        found = SitemapPaths()
+        urls = 0
+        try:
+            for loc, lastmod in iter_sitemap(make_session(), child):
+                found.add(loc.replace(BASE, "").strip("/"), lastmod)
+                urls += 1
+        except SitemapUnavailable:
+            # Keep what streamed in; main() must not treat the rest as delisted
+            found.failed.add(child)
+        return child, urls, found
+
+    paths = SitemapPaths()
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(children)))) as pool:
+        for child, urls, found in pool.map(read_child, children):
+            paths.update(found)
+            log(f"  {child.rsplit('/', 1)[-1]}: {urls:,} urls{'' if found.complete else ' (incomplete)'}")
+    return paths
 
 
 # ------------------------------------------------------------- extraction ----
 
-def _json_blocks(html: str) -> list[dict]:
-    out = []
-    for raw in re.findall(
-        r'<script type="application/ld\+json">(.*?)</script>', html, re.S
-    ):
+# Salon pages are ~100 KB of markup around a few small JSON-LD scripts. The
+# extractor walks them with str.find - no regex over the whole page - decodes
+# with orjson when it is installed, and parse_salon stops reading blocks once it
+# has both the business block and the Yext certified-fact block.
+
+_LD_OPEN = '<script type="application/ld+json">'
+_LD_CLOSE = "</script>"
+_BUSINESS_TYPES = ("HealthAndBeautyBusiness", "HairSalon", "LocalBusiness")
+_YEXT_COORD = '"yextDisplayCoordinate":{'
+_YEXT_COORD_RE = re.compile(r'"latitude":([-\d.]+),"longitude":([-\d.]+)\}')
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_blocks(html: str):
+    """Yield each JSON-LD object on the page, in order; @graph lists are flattened."""
+    pos = 0
+    while True:
+        start = html.find(_LD_OPEN, pos)
+        if start < 0:
+            return
+        start += len(_LD_OPEN)
+        end = html.find(_LD_CLOSE, start)
+        if end < 0:
+            return
+        pos = end + len(_LD_CLOSE)
         try:
-            parsed = json.loads(raw.strip())
-        except (json.JSONDecodeError, ValueError):
+            parsed = _loads(html[start:end].strip())
+        except ValueError:
             continue
         if isinstance(parsed, dict) and "@graph" in parsed:
             for node in parsed["@graph"]:
                 if isinstance(node, dict):
-                    out.append(node)
+                    yield node
         elif isinstance(parsed, dict):
-            out.append(parsed)
-    return out
+            yield parsed
+
+
+def _salon_blocks(html: str) -> tuple[dict | None, dict | None]:
+    """(business block, Yext credentialSubject) - the first of each on the page."""
+    business = subject = None
+    for block in _json_blocks(html):
+        if (
+            business is None
+            and isinstance(block.get("address"), dict)
+            and block.get("@type") in _BUSINESS_TYPES
+        ):
+            business = block
+        if subject is None:
+            cand = block.get("credentialSubject")
+            if isinstance(cand, dict) and isinstance(cand.get("address"), dict):
+                subject = cand
+        if business is not None and subject is not None:
+            break
+    return business, subject
+
+
+def _yext_coordinate(html: str) -> tuple[float, float] | None:
+    at = html.find(_YEXT_COORD)
+    while at >= 0:
+        m = _YEXT_COORD_RE.match(html, at + len(_YEXT_COORD))
+        if m:
+            return round(float(m.group(1)), 6), round(float(m.group(2)), 6)
+        at = html.find(_YEXT_COORD, at + 1)
+    return None
 
 
 def _normalize_hours(opening_hours) -> dict[str, str]:
@@ -199,29 +396,7 @@ def _pretty_range(rng: str) -> str:
 
 def parse_salon(path: str, html: str) -> dict | None:
     """Pull the facts we need out of a salon detail page."""
-    blocks = _json_blocks(html)
-
-    business = next(
-        (
-            b
-            for b in blocks
-            if isinstance(b.get("address"), dict)
-            and b.get("@type")
-            in ("HealthAndBeautyBusiness", "HairSalon", "LocalBusiness")
-        ),
-        None,
-    )
-
-    # Yext certified-fact block carries geo coordinates.
-    subject = next(
-        (
-            b.get("credentialSubject")
-            for b in blocks
-            if isinstance(b.get("credentialSubject"), dict)
-            and isinstance(b["credentialSubject"].get("address"), dict)
-        ),
-        None,
-    )
+    business, subject = _salon_blocks(html)
 
     address = (business or {}).get("address") or (subject or {}).get("address")
     if not address:
@@ -242,12 +417,9 @@ def parse_salon(path: str, html: str) -> dict | None:
         except (KeyError, TypeError, ValueError):
             lat = lng = None
     if lat is None:
-        m = re.search(
-            r'"yextDisplayCoordinate":\{"latitude":([-\d.]+),"longitude":([-\d.]+)\}',
-            html,
-        )
-        if m:
-            lat, lng = round(float(m.group(1)), 6), round(float(m.group(2)), 6)
+        coord = _yext_coordinate(html)
+        if coord:
+            lat, lng = coord
 
     phone = (business or {}).get("telephone") or ""
     if not phone and subject:
@@ -280,8 +452,7 @@ def parse_salon(path: str, html: str) -> dict | None:
     }
 
 
-def fetch_one(session: requests.Session, path: str) -> dict | None:
-    html = get(session, BASE + path)
+def parse_or_log(path: str, html: str | None) -> dict | None:
     if not html:
         return None
     try:
@@ -291,31 +462,295 @@ def fetch_one(session: requests.Session, path: str) -> dict | None:
         return None
 
 
+def fetch_one(session: requests.Session, path: str) -> dict | None:
+    return parse_or_log(path, get(session, BASE + path))
+
+
+# ------------------------------------------------------------ async crawl ----
+#
+# --async swaps the thread pool for one asyncio event loop. Pages come through a
+# single pooled client - httpx, over HTTP/2 when the h2 package is installed,
+# else requests sessions on worker threads - gated by an AIMD limiter: the number
+# of requests in flight grows by one after each window of clean responses and
+# halves on a 429, 5xx or connection error. A full refresh climbs to whatever
+# rate the locator sustains and backs off the moment it objects.
+
+MAX_CONCURRENCY = int(os.environ.get("GC_MAX_CONCURRENCY", "48"))
+THROTTLE_COOLDOWN = 1.0  # seconds; a burst of failures halves the limit once
+
+
+class AdaptiveLimiter:
+    """Async concurrency gate whose limit follows additive-increase / multiplicative-decrease."""
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = max(minimum, min(initial, self.maximum))
+        self.in_flight = 0
+        self.cuts = 0
+        self._clean = 0
+        self._last_cut = float("-inf")
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def success(self) -> None:
+        async with self._cond:
+            self._clean += 1
+            if self._clean >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._clean = 0
+                self._cond.notify_all()
+
+    async def throttled(self) -> None:
+        async with self._cond:
+            self._clean = 0
+            now = time.monotonic()
+            if now - self._last_cut < THROTTLE_COOLDOWN:
+                return
+            self._last_cut = now
+            new_limit = max(self.minimum, self.limit // 2)
+            if new_limit < self.limit:
+                self.limit = new_limit
+                self.cuts += 1
+                log(f"  ~ locator pushed back; {self.limit} request(s) in flight")
+
+
+class AsyncClient:
+    """One pooled client for the whole crawl. get() returns (status, text, retry_after)."""
+
+    def __init__(self, max_connections: int):
+        self._client = None
+        self._pool = None
+        if httpx is not None:
+            http2 = importlib.util.find_spec("h2") is not None
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,*/*"},
+                timeout=TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+            self.kind = "httpx over HTTP/2" if http2 else "httpx over HTTP/1.1"
+        else:
+            self._local = threading.local()
+            self._pool = ThreadPoolExecutor(max_workers=max_connections)
+            self.kind = "requests on worker threads (pip install 'httpx[http2]' for HTTP/2)"
+
+    def _sync_get(self, url: str) -> tuple[int, str, str | None]:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = make_session()
+        r = session.get(url, timeout=TIMEOUT)
+        return r.status_code, r.text, r.headers.get("Retry-After")
+
+    async def get(self, url: str) -> tuple[int, str, str | None]:
+        if self._client is not None:
+            r = await self._client.get(url)
+            return r.status_code, r.text, r.headers.get("Retry-After")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._sync_get, url)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+async def get_async(client: AsyncClient, limiter: AdaptiveLimiter, url: str) -> str | None:
+    """get(), asynchronously: retries with jittered backoff, feeding the limiter."""
+    for attempt in range(RETRIES):
+        retry_after = None
+        try:
+            async with limiter:
+                status, text, retry_after = await client.get(url)
+        except Exception:  # noqa: BLE001 - connection errors are retried like a 5xx
+            status = None
+        if status == 200:
+            await limiter.success()
+            return text
+        if status in (404, 410):
+            await limiter.success()
+            return None
+        await limiter.throttled()
+        if attempt + 1 < RETRIES:
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+    return None
+
+
+async def crawl_async(paths: list[str], on_record) -> tuple[int, int]:
+    """Fetch and parse every salon path; on_record(rec) gets each parsed salon.
+
+    Returns (done, failed).
+    """
+    client = AsyncClient(MAX_CONCURRENCY)
+    limiter = AdaptiveLimiter(WORKERS, MAX_CONCURRENCY)
+    log(f"  async crawl via {client.kind}: {limiter.limit} in flight to start, up to {MAX_CONCURRENCY}")
+
+    queue = list(reversed(paths))
+    done = failed = 0
+
+    async def worker() -> None:
+        nonlocal done, failed
+        while queue:
+            path = queue.pop()
+            rec = parse_or_log(path, await get_async(client, limiter, BASE + path))
+            if rec:
+                on_record(rec)
+                done += 1
+            else:
+                failed += 1
+            total = done + failed
+            if total % 250 == 0:
+                log(f"  {total:,}/{len(paths):,} ({failed} failed, {limiter.limit} in flight)")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(MAX_CONCURRENCY, len(paths)))))
+    finally:
+        await client.aclose()
+    log(f"  finished at {limiter.limit} in flight ({limiter.cuts} slow-down(s))")
+    return done, failed
+
+
 # ------------------------------------------------------------------ cache ----
 
-def load_cache() -> dict[str, dict]:
-    if not CACHE_FILE.exists():
-        return {}
-    records: dict[str, dict] = {}
-    with CACHE_FILE.open(encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if rec.get("path"):
-                records[rec["path"]] = rec
-    return records
-
-
-def append_cache(rec: dict) -> None:
-    with _cache_lock:
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        with CACHE_FILE.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+# The cache is one SQLite table keyed by salon path: a refetch replaces the row
+# instead of appending another line, so loading reads each salon once however
+# many refreshes the cache has seen. Rows carry the record format version and
+# when they were fetched; rows of another version are ignored (and so refetched).
+# Writes are buffered and committed CACHE_FLUSH_EVERY at a time, so an
+# interrupted run keeps all but the last few pages it fetched.
+#
+# A second table counts the runs in a row each child sitemap has failed. One
+# that fails SITEMAP_DROP_AFTER_RUNS runs in a row is taken to be gone for good,
+# so it stops holding back the compaction of salons the locator has delisted.
+
+CACHE_VERSION = 1
+CACHE_FLUSH_EVERY = 200
+# VACUUM once this share of the file is free pages left behind by deletes
+CACHE_VACUUM_FREE = 0.25
+SITEMAP_DROP_AFTER_RUNS = int(os.environ.get("GC_SITEMAP_DROP_AFTER_RUNS", "3"))
+
+
+class SalonCache:
+    """path -> parsed salon record, persisted in CACHE_DB."""
+
+    def __init__(self, db_path: Path = CACHE_DB):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS salons (
+                   path       TEXT PRIMARY KEY,
+                   version    INTEGER NOT NULL,
+                   fetched_at TEXT NOT NULL,
+                   lastmod    TEXT,
+                   record     TEXT NOT NULL
+               ) WITHOUT ROWID"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS sitemap_failures (
+                   child TEXT PRIMARY KEY,
+                   runs  INTEGER NOT NULL
+               ) WITHOUT ROWID"""
+        )
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        if LEGACY_CACHE_FILE.exists():
+            self._import_jsonl(LEGACY_CACHE_FILE)
+
+    def _import_jsonl(self, path: Path) -> None:
+        """One-off migration from the append-only salons.jsonl; later lines win."""
+        records: dict[str, dict] = {}
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if rec.get("path"):
+                    records[rec["path"]] = rec
+        fetched_at = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for rec in records.values():
+            self.put(rec, fetched_at)
+        self.flush()
+        path.unlink()
+        log(f"  migrated {len(records):,} salons from {path.name} to {CACHE_DB.name}")
+
+    def load(self) -> dict[str, dict]:
+        rows = self._db.execute("SELECT record FROM salons WHERE version = ?", (CACHE_VERSION,))
+        records: dict[str, dict] = {}
+        for (raw,) in rows:
+            rec = json.loads(raw)
+            records[rec["path"]] = rec
+        return records
+
+    def put(self, rec: dict, fetched_at: str | None = None) -> None:
+        fetched_at = fetched_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        row = (rec["path"], CACHE_VERSION, fetched_at, rec.get("lastmod"), json.dumps(rec, ensure_ascii=False))
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= CACHE_FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO salons VALUES (?, ?, ?, ?, ?)", self._pending)
+        self._pending.clear()
+
+    def compact(self, keep: set[str]) -> int:
+        """Drop salons not in `keep` and rows of an old version; VACUUM if it pays.
+
+        Returns the number of rows dropped.
+        """
+        self.flush()
+        with self._lock, self._db:
+            paths = [p for (p,) in self._db.execute("SELECT path FROM salons")]
+            gone = [(p,) for p in paths if p not in keep]
+            self._db.executemany("DELETE FROM salons WHERE path = ?", gone)
+            dropped = len(gone) + self._db.execute(
+                "DELETE FROM salons WHERE version != ?", (CACHE_VERSION,)
+            ).rowcount
+        free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        if pages and free / pages >= CACHE_VACUUM_FREE:
+            self._db.execute("VACUUM")
+        return dropped
+
+    def note_sitemap_failures(self, failed: set[str]) -> dict[str, int]:
+        """Record which child sitemaps failed this run; returns child -> runs in a row."""
+        with self._lock, self._db:
+            before = dict(self._db.execute("SELECT child, runs FROM sitemap_failures"))
+            runs = {child: before.get(child, 0) + 1 for child in failed}
+            self._db.execute("DELETE FROM sitemap_failures")
+            self._db.executemany("INSERT INTO sitemap_failures VALUES (?, ?)", runs.items())
+        return runs
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
 
 
 # ------------------------------------------------------------------- main ----
@@ -331,14 +766,21 @@ def main() -> int:
         help="keep US salons only (default)",
     )
     ap.add_argument("--include-canada", dest="us_only", action="store_false")
+    ap.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="crawl with asyncio and an adaptive rate limit instead of threads",
+    )
     args = ap.parse_args()
 
     session = make_session()
 
     print("Fetching locator sitemap...")
-    paths = fetch_sitemap_paths(session)
-    salon_paths, city_paths = split_paths(paths)
+    sitemap = fetch_sitemap_paths(session)
+    salon_paths, city_paths = sitemap.salon_paths(), sitemap.city_paths()
     print(f"  -> {len(salon_paths):,} salon pages, {len(city_paths):,} city pages")
+    listed = set(salon_paths)
 
     if args.us_only:
         salon_paths = [p for p in salon_paths if p.startswith("us/")]
@@ -347,15 +789,43 @@ def main() -> int:
     if args.limit:
         salon_paths = salon_paths[: args.limit]
 
-    cache = {} if args.no_cache else load_cache()
+    store = SalonCache()
+    cache = {} if args.no_cache else store.load()
+    failing = store.note_sitemap_failures(sitemap.failed)
+    for child, runs in sorted(failing.items()):
+        if runs >= SITEMAP_DROP_AFTER_RUNS:
+            log(f"  ! {child.rsplit('/', 1)[-1]} has failed {runs} runs in a row; treating it as delisted")
+            sitemap.failed.discard(child)
+    lastmods = sitemap.lastmods()
     if cache:
-        print(f"  -> {len(cache):,} salons already cached")
+        stale = sum(
+            1
+            for p in salon_paths
+            if p in cache and lastmods.get(p) and cache[p].get("lastmod") != lastmods[p]
+        )
+        gone = sum(1 for p in cache if p not in listed)
+        print(
+            f"  -> {len(cache):,} salons cached: {stale:,} changed since (lastmod), "
+            f"{gone:,} no longer listed"
+        )
+
+    todo = [
+        p
+        for p in salon_paths
+        if p not in cache or (lastmods.get(p) and cache[p].get("lastmod") != lastmods[p])
+    ]
 
-    todo = [p for p in salon_paths if p not in cache]
-    print(f"Fetching {len(todo):,} salon pages with {WORKERS} workers...")
+    def record(rec: dict) -> None:
+        rec["lastmod"] = lastmods.get(rec["path"])
+        cache[rec["path"]] = rec
+        store.put(rec)
 
     done = failed = 0
-    if todo:
+    if todo and args.use_async:
+        print(f"Fetching {len(todo):,} salon pages asynchronously...")
+        done, failed = asyncio.run(crawl_async(todo, record))
+    elif todo:
+        print(f"Fetching {len(todo):,} salon pages with {WORKERS} workers...")
         sessions = [make_session() for _ in range(WORKERS)]
         with ThreadPoolExecutor(max_workers=WORKERS) as pool:
             futures = {
@@ -370,8 +840,7 @@ def main() -> int:
                     rec = None
                     log(f"  ! {path}: {exc}")
                 if rec:
-                    cache[path] = rec
-                    append_cache(rec)
+                    record(rec)
                     done += 1
                 else:
                     failed += 1
@@ -379,7 +848,22 @@ def main() -> int:
                 if total % 250 == 0:
                     log(f"  {total:,}/{len(todo):,} ({failed} failed)")
 
-    salons = [cache[p] for p in salon_paths if p in cache]
+    # Salons the locator no longer lists go; a --limit run has not seen them all,
+    # and a sitemap that failed or broke off leaves out salons that still exist
+    if not args.limit and sitemap.complete:
+        dropped = store.compact(listed)
+        if dropped:
+            print(f"  -> dropped {dropped:,} unlisted salon(s) from the cache")
+    elif not sitemap.complete:
+        print("  -> sitemap listing incomplete; keeping unlisted salons in the cache")
+    store.close()
+
+    # lastmod is cache bookkeeping, not a salon fact
+    salons = [
+        {k: v for k, v in cache[p].items() if k not in CACHE_ONLY_FIELDS}
+        for p in salon_paths
+        if p in cache
+    ]
     salons.sort(key=lambda s: (s["state"], s["city"], s["street"]))
 
     if not salons:
@@ -397,12 +881,26 @@ def main() -> int:
         "salons": salons,
     }
 
-    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with OUT_FILE.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=1, ensure_ascii=False)
+    try:
+        with OUT_FILE.open(encoding="utf-8") as fh:
+            previous = json.load(fh)
+    except (OSError, ValueError):
+        previous = {}
+
+    # fetched_at alone changing means nothing was learned - keep the old file
+    written = atomic_write.write_json(OUT_FILE, payload, volatile=("fetched_at",), indent=1, ensure_ascii=False)
 
     print()
-    print(f"Wrote {OUT_FILE.relative_to(REPO_ROOT)}")
+    print(f"{'Wrote' if written else 'Unchanged:'} {OUT_FILE.relative_to(REPO_ROOT)}")
+    if salon_store.build(OUT_FILE):
+        print(f"Wrote {salon_store.columns_path(OUT_FILE).relative_to(REPO_ROOT)}")
+    changes = salon_changes.diff_salons(previous, payload)
+    changes_file = OUT_FILE.parent / salon_changes.CHANGES_FILE.name
+    salon_changes.write_changes(changes, changes_file)
+    print(f"Changes       : {salon_changes.summary(changes)} -> {changes_file.relative_to(REPO_ROOT)}")
+    hours_file = OUT_FILE.parent / salon_hours.HOURS_FILE.name
+    if salon_hours.write_table(salons, hours_file, atomic_write.file_digest(OUT_FILE)):
+        print(f"Wrote {hours_file.relative_to(REPO_ROOT)}")
     print(f"  salons        : {len(salons):,}")
     print(f"  cities        : {len(cities):,}")
     print(f"  states        : {len({s['state'] for s in salons})}")
@@ -377,7 +377,7 @@ def main() -> int:
     ap.add_argument("--check", action="store_true", help="report without writing")
     args = ap.parse_args()
 
-    cities, metros = markets.build_all()
+    cities, metros = markets.build_all(columns=())
 
     print("State pages:")
     updated, skipped, counts = inject_state_pages(cities, metros, args.check)
@@ -27,16 +27,37 @@ Two things live here:
 
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+import os
+import pickle
 import re
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
+import atomic_write
+import salon_store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 REPO_ROOT = Path(__file__).resolve().parent.parent
 SALONS_FILE = REPO_ROOT / "data" / "salons.json"
 METROS_FILE = REPO_ROOT / "data" / "metros.json"
 
+# build_all() snapshots its result here, keyed by a hash of salons.json, this
+# file and MODEL_CACHE_VERSION (not by the salon columns a step asks for), so
+# every build step after the first in a run loads the model in ~40 ms instead of
+# clustering again (~0.5 s). Bump the version if the model ever depends on
+# something outside this file.
+MODEL_CACHE_DIR = Path(os.environ.get("GC_MARKETS_CACHE_DIR", REPO_ROOT / ".cache" / "markets"))
+MODEL_CACHE_VERSION = 1
+MODEL_CACHE_KEEP = 6  # snapshots kept; older ones are deleted
+
 EARTH_RADIUS_MI = 3958.8
 
 # Anchor reach in miles, keyed on how many salons sit within DENSITY_RADIUS_MI of
@@ -572,6 +593,19 @@ def haversine_mi(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     return 2 * EARTH_RADIUS_MI * math.asin(math.sqrt(a))
 
 
+def haversine_many(lats1, lngs1, lats2, lngs2):
+    """Great-circle miles from every point of set 1 to every point of set 2.
+
+    NumPy version of haversine_mi over whole arrays: returns a len1 x len2 matrix.
+    """
+    p1 = np.radians(np.asarray(lats1, dtype=float))[:, None]
+    p2 = np.radians(np.asarray(lats2, dtype=float))[None, :]
+    dp = p2 - p1
+    dl = np.radians(np.asarray(lngs2, dtype=float)[None, :] - np.asarray(lngs1, dtype=float)[:, None])
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_MI * np.arcsin(np.sqrt(a))
+
+
 def reach_for(density: int) -> float:
     """Anchor reach in miles for a given surrounding-salon density."""
     for threshold, miles in REACH_TIERS:
@@ -604,13 +638,38 @@ def normalize_city(name: str) -> str:
 
 # ---------------------------------------------------------------- cities -----
 
-def load_salons(path: Path = SALONS_FILE) -> list[dict]:
+# What build_cities() reads from each salon. Callers that only need the market
+# model load just these; the ones rendering salon cards ask for more.
+CITY_COLUMNS = ("country", "state", "city", "street", "lat", "lng")
+
+
+def load_salons(path: Path = SALONS_FILE, columns=None) -> list[dict]:
+    """Salon records, limited to `columns` plus CITY_COLUMNS (None = every field).
+
+    Read from the columnar copy (scripts/salon_store.py) when it is up to date,
+    else from the JSON itself.
+    """
     if not path.exists():
         raise SystemExit(
             f"{path} not found - run scripts/fetch_salons.py first."
         )
+    if columns is not None:
+        columns = tuple(dict.fromkeys((*CITY_COLUMNS, *columns)))
+    salons = salon_store.load(path, columns)
+    if salons is not None:
+        return salons
     with path.open(encoding="utf-8") as fh:
-        return json.load(fh)["salons"]
+        salons = json.load(fh)["salons"]
+    if columns is not None:
+        salons = [{k: v for k, v in s.items() if k in columns} for s in salons]
+    return salons
+
+
+def city_key(salon: dict) -> str | None:
+    """'ST/normalized-slug' of the city a salon belongs to; None outside the US."""
+    if salon.get("country", "US") != "US":
+        return None
+    return f"{salon['state']}/{slugify(normalize_city(salon['city']))}"
 
 
 def build_cities(salons: list[dict]) -> dict[str, dict]:
@@ -626,10 +685,10 @@ def build_cities(salons: list[dict]) -> dict[str, dict]:
     groups: dict[str, dict] = {}
 
     for salon in salons:
-        if salon.get("country", "US") != "US":
+        key = city_key(salon)
+        if key is None:
             continue
         state, city = salon["state"], salon["city"]
-        key = f"{state}/{slugify(normalize_city(city))}"
         entry = groups.setdefault(
             key, {"key": key, "state": state, "spellings": {}, "salons": []}
         )
@@ -675,19 +734,30 @@ def _spatial_index(cities: list[dict], cell_deg: float = 0.75) -> dict:
     return {"grid": grid, "cell_deg": cell_deg}
 
 
-def _neighbours(index: dict, city: dict, radius_mi: float) -> list[dict]:
-    """Cities in the grid cells that could hold anything within radius_mi."""
-    cell_deg = index["cell_deg"]
-    span = int(radius_mi / (69.0 * cell_deg)) + 1
-    base = (int(city["lat"] // cell_deg), int(city["lng"] // cell_deg))
+def _cell_neighbours(index: dict, cell: tuple[int, int], radius_mi: float) -> list[dict]:
+    """Everything in the grid cells that could hold a point within radius_mi of `cell`."""
+    span = int(radius_mi / (69.0 * index["cell_deg"])) + 1
     out: list[dict] = []
     for dy in range(-span, span + 1):
         for dx in range(-span, span + 1):
-            out.extend(index["grid"].get((base[0] + dy, base[1] + dx), ()))
+            out.extend(index["grid"].get((cell[0] + dy, cell[1] + dx), ()))
     return out
 
 
-def compute_density(cities: dict[str, dict]) -> None:
+def _neighbours(index: dict, city: dict, radius_mi: float) -> list[dict]:
+    """Cities in the grid cells that could hold anything within radius_mi."""
+    cell_deg = index["cell_deg"]
+    base = (int(city["lat"] // cell_deg), int(city["lng"] // cell_deg))
+    return _cell_neighbours(index, base, radius_mi)
+
+
+# The distance-heavy steps below run in one of two ways. With NumPy installed,
+# each grid cell is one batch: the distances from all of its cities to all of
+# their candidates come out of a single haversine_many() call. Without it, the
+# plain per-pair loops run instead. Those stay the reference - the NumPy path
+# must give the same densities and metros (scripts/benchmarks.py density).
+
+def compute_density(cities: dict[str, dict], use_numpy: bool | None = None) -> None:
     """Set city['density'] = salons within DENSITY_RADIUS_MI, including its own.
 
     This is the metro-size signal. Downtown Chicago has ~20 salons of its own but
@@ -697,6 +767,16 @@ def compute_density(cities: dict[str, dict]) -> None:
     geo = [c for c in cities.values() if c["lat"] is not None]
     index = _spatial_index(geo)
 
+    if np is not None if use_numpy is None else use_numpy:
+        _density_numpy(geo, index)
+    else:
+        _density_scalar(geo, index)
+
+    for city in cities.values():
+        city.setdefault("density", city["salon_count"])
+
+
+def _density_scalar(geo: list[dict], index: dict) -> None:
     for city in geo:
         total = 0
         for other in _neighbours(index, city, DENSITY_RADIUS_MI):
@@ -707,11 +787,93 @@ def compute_density(cities: dict[str, dict]) -> None:
                 total += other["salon_count"]
         city["density"] = total
 
-    for city in cities.values():
-        city.setdefault("density", city["salon_count"])
+
+def _density_numpy(geo: list[dict], index: dict) -> None:
+    lat = np.array([c["lat"] for c in geo])
+    lng = np.array([c["lng"] for c in geo])
+    counts = np.array([c["salon_count"] for c in geo])
+    position = {id(c): i for i, c in enumerate(geo)}
+    cells = {cell: np.array([position[id(c)] for c in members]) for cell, members in index["grid"].items()}
+    span = int(DENSITY_RADIUS_MI / (69.0 * index["cell_deg"])) + 1
+
+    for (y, x), rows in cells.items():
+        cols = np.concatenate([
+            cells[(y + dy, x + dx)]
+            for dy in range(-span, span + 1)
+            for dx in range(-span, span + 1)
+            if (y + dy, x + dx) in cells
+        ])
+        dist = haversine_many(lat[rows], lng[rows], lat[cols], lng[cols])
+        density = (dist <= DENSITY_RADIUS_MI) @ counts[cols]
+        for i, total in zip(rows, density.tolist()):
+            geo[i]["density"] = total
+
+
+def _nearest_anchors(
+    cities: list[dict], anchor_index: dict, max_reach: float, use_numpy: bool | None = None
+) -> dict[str, dict | None]:
+    """City key -> the closest anchor whose reach covers it (None if none does)."""
+    if not (np is not None if use_numpy is None else use_numpy):
+        nearest: dict[str, dict | None] = {}
+        for city in cities:
+            best, best_dist = None, None
+            for anchor in _neighbours(anchor_index, city, max_reach):
+                d = haversine_mi(city["lat"], city["lng"], anchor["lat"], anchor["lng"])
+                if d <= reach_for(anchor["density"]) and (best_dist is None or d < best_dist):
+                    best, best_dist = anchor, d
+            nearest[city["key"]] = best
+        return nearest
+
+    nearest = {}
+    city_index = _spatial_index(cities, anchor_index["cell_deg"])
+    for cell, members in city_index["grid"].items():
+        anchors = _cell_neighbours(anchor_index, cell, max_reach)
+        if not anchors:
+            nearest.update((c["key"], None) for c in members)
+            continue
+        dist = haversine_many(
+            [c["lat"] for c in members], [c["lng"] for c in members],
+            [a["lat"] for a in anchors], [a["lng"] for a in anchors],
+        )
+        reach = np.array([reach_for(a["density"]) for a in anchors])
+        dist = np.where(dist <= reach, dist, np.inf)
+        best = dist.argmin(axis=1)  # first minimum, like the strict < in the loop
+        for city, j, row in zip(members, best, dist):
+            nearest[city["key"]] = anchors[j] if np.isfinite(row[j]) else None
+    return nearest
+
+
+MAX_REACH_MI = max(miles for _, miles in REACH_TIERS)
 
 
-def build_metros(cities: dict[str, dict]) -> dict[str, dict]:
+def _select_anchors(ordered: list[dict]) -> list[dict]:
+    """Walk cities in anchor-priority order; each one no earlier anchor reaches becomes one.
+
+    Anchors go into a grid as they are chosen, so a city is only tested against
+    anchors in the cells within MAX_REACH_MI of it - not against all of them.
+    The longitude span widens with latitude, so nothing in reach is skipped.
+    """
+    index: dict = {"grid": {}, "cell_deg": 0.75}
+    cell_deg = index["cell_deg"]
+    span_y = int(MAX_REACH_MI / (69.0 * cell_deg)) + 1
+    anchors: list[dict] = []
+    for city in ordered:
+        y, x = int(city["lat"] // cell_deg), int(city["lng"] // cell_deg)
+        edge_lat = min(89.0, abs(city["lat"]) + (span_y + 1) * cell_deg)
+        span_x = int(MAX_REACH_MI / (69.0 * math.cos(math.radians(edge_lat)) * cell_deg)) + 1
+        covered = any(
+            haversine_mi(city["lat"], city["lng"], a["lat"], a["lng"]) <= reach_for(a["density"])
+            for dy in range(-span_y, span_y + 1)
+            for dx in range(-span_x, span_x + 1)
+            for a in index["grid"].get((y + dy, x + dx), ())
+        )
+        if not covered:
+            anchors.append(city)
+            index["grid"].setdefault((y, x), []).append(city)
+    return anchors
+
+
+def build_metros(cities: dict[str, dict], use_numpy: bool | None = None) -> dict[str, dict]:
     """Cluster cities into metro markets around greedily chosen anchors.
 
     Anchors are taken in descending density order, so the centre of each metro
@@ -721,23 +883,14 @@ def build_metros(cities: dict[str, dict]) -> dict[str, dict]:
     linking neighbour to neighbour - is what keeps the continuous suburb chain up
     I-94 from welding Chicago to Milwaukee into one market.
     """
-    compute_density(cities)
+    compute_density(cities, use_numpy)
 
     geo = [c for c in cities.values() if c["lat"] is not None]
     ordered = sorted(
         geo, key=lambda c: (-c["density"], -c["salon_count"], c["state"], c["city"])
     )
-    index = _spatial_index(geo)
 
-    anchors: list[dict] = []
-    for city in ordered:
-        covered = any(
-            haversine_mi(city["lat"], city["lng"], a["lat"], a["lng"])
-            <= reach_for(a["density"])
-            for a in anchors
-        )
-        if not covered:
-            anchors.append(city)
+    anchors = _select_anchors(ordered)
 
     metros: dict[str, dict] = {}
     for anchor in anchors:
@@ -754,17 +907,16 @@ def build_metros(cities: dict[str, dict]) -> dict[str, dict]:
         }
 
     anchor_index = _spatial_index(anchors)
-    max_reach = max(REACH_TIERS, key=lambda t: t[1])[1]
+    max_reach = MAX_REACH_MI
+
+    nearest = _nearest_anchors(ordered, anchor_index, max_reach, use_numpy)
 
     for city in ordered:
         best_key, best_dist = None, None
-        for anchor in _neighbours(anchor_index, city, max_reach):
-            d = haversine_mi(city["lat"], city["lng"], anchor["lat"], anchor["lng"])
-            if d <= reach_for(anchor["density"]) and (
-                best_dist is None or d < best_dist
-            ):
-                best_key = f"{anchor['state']}/{anchor['slug']}"
-                best_dist = d
+        anchor = nearest[city["key"]]
+        if anchor is not None:
+            best_key = f"{anchor['state']}/{anchor['slug']}"
+            best_dist = haversine_mi(city["lat"], city["lng"], anchor["lat"], anchor["lng"])
         if best_key is None:  # should not happen; anchors cover every city
             best_key = f"{city['state']}/{city['slug']}"
             metros.setdefault(
@@ -825,7 +977,10 @@ def build_place_coords(cities: dict[str, dict]) -> dict[str, tuple[float, float]
     return coords
 
 
+@lru_cache(maxsize=None)
 def _place_id(spec: str) -> str:
+    # Naming the metros asks for every PRINCIPAL_CITIES / TWIN_MARKETS spec once
+    # per metro; cached, each is normalized once
     name, _, state = spec.rpartition(",")
     return f"{normalize_city(name)}|{state.strip()}"
 
@@ -854,6 +1009,10 @@ def _pick_market_name(
         held_by = owner.get(pid)
         if held_by is not None and held_by != metro["key"]:
             continue
+        # A degree of latitude is never less than 69 miles: most candidates are
+        # ruled out without the great-circle formula
+        if abs(latlng[0] - metro["lat"]) * 69.0 > reach:
+            continue
         if haversine_mi(metro["lat"], metro["lng"], latlng[0], latlng[1]) <= reach:
             lead_spec = spec
             break
@@ -912,30 +1071,25 @@ def _name_metros(metros: dict[str, dict], cities: dict[str, dict]) -> None:
         # be called Detroit rather than Warren.
         name = _pick_market_name(metro, members, city_coords, owner)
         metro["name"] = name
+        lead = normalize_city(name.split("-")[0])
         metro["name_city_key"] = next(
-            (
-                c["key"]
-                for c in members
-                if normalize_city(c["city"]) == normalize_city(name.split("-")[0])
-            ),
+            (c["key"] for c in members if normalize_city(c["city"]) == lead),
             metro["key"],
         )
         metro["city_keys"] = [c["key"] for c in members]
 
     _dedupe_market_names(metros, cities, city_coords)
 
+    principal_state: dict[str, str] = {}
+    for spec in PRINCIPAL_CITIES:
+        name, _, state = spec.rpartition(",")
+        principal_state.setdefault(name, state.strip())
+
     for metro in metros.values():
         # If the market is named after a city in a state none of its salons are in
         # - the salons nearest New York City are all in New Jersey - say "area" so
         # "New York Area, NJ" does not read as a mistake.
-        lead_state = next(
-            (
-                spec.rpartition(",")[2].strip()
-                for spec in PRINCIPAL_CITIES
-                if spec.rpartition(",")[0] == metro["name"].split("-")[0]
-            ),
-            None,
-        )
+        lead_state = principal_state.get(metro["name"].split("-")[0])
         label = metro["name"]
         if lead_state and lead_state not in metro["states"]:
             label = f"{metro['name']} Area"
@@ -1050,6 +1204,54 @@ def _state_code_list(area: str) -> list[str]:
     return list(dict.fromkeys(codes))
 
 
+# resolve_area looks for every alias inside every market-string token. Matching
+# a regex per alias was the bulk of that work, so the aliases go into a trie of
+# words, built once: a string is split into words and each word start walks the
+# trie, which finds every contained alias (overlaps included) in one pass.
+_WORD = re.compile(r"\w+")
+_ALIAS_END = ""  # trie key marking "an alias ends here"
+
+
+def _alias_trie(aliases) -> dict:
+    """Word trie over alias keys; each alias's end node holds its key."""
+    root: dict = {}
+    for key in aliases:
+        words = key.split(" ")
+        if not all(_WORD.fullmatch(w) for w in words):
+            raise ValueError(f"alias {key!r} must be words separated by single spaces")
+        node = root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[_ALIAS_END] = key
+    return root
+
+
+_ALIAS_TRIE = _alias_trie(AREA_ALIASES)
+_ALIAS_ORDER = {key: i for i, key in enumerate(AREA_ALIASES)}
+
+
+def contained_aliases(norm: str) -> list[str]:
+    """AREA_ALIASES keys found as whole words in a normalized string, longest first.
+
+    Same hits and order as testing rf"\\b{key}\\b" for every key and sorting by
+    length (ties in AREA_ALIASES order).
+    """
+    words = list(_WORD.finditer(norm))
+    found: set[str] = set()
+    for start, first in enumerate(words):
+        node = _ALIAS_TRIE.get(first.group())
+        i = start
+        while node is not None:
+            if _ALIAS_END in node:
+                found.add(node[_ALIAS_END])
+            # Multi-word aliases continue only across a single space
+            i += 1
+            if i == len(words) or norm[words[i - 1].end() : words[i].start()] != " ":
+                break
+            node = node.get(words[i].group())
+    return sorted(found, key=lambda k: (-len(k), _ALIAS_ORDER[k]))
+
+
 def resolve_area(
     area: str,
     cities: dict[str, dict],
@@ -1091,16 +1293,7 @@ def resolve_area(
 
         # Market strings pad the nickname with extra words ("DFW Metroplex",
         # "Chicagoland Suburbs"). Try the longest alias contained in the string.
-        contained = sorted(
-            (
-                key
-                for key in AREA_ALIASES
-                if re.search(rf"\b{re.escape(key)}\b", norm)
-            ),
-            key=len,
-            reverse=True,
-        )
-        for key in contained:
+        for key in contained_aliases(norm):
             if apply_alias(key):
                 return True
 
@@ -1300,14 +1493,133 @@ def _add_metro_near_center(
 
 # -------------------------------------------------------------- build/save ---
 
-def build_all(salons_path: Path = SALONS_FILE) -> tuple[dict, dict]:
-    salons = load_salons(salons_path)
-    cities = build_cities(salons)
-    metros = build_metros(cities)
+def _model_key(salons_path: Path) -> str | None:
+    salons_digest = atomic_write.file_digest(salons_path)
+    if salons_digest is None:
+        return None
+    h = hashlib.sha256()
+    h.update(f"v{MODEL_CACHE_VERSION}|{salons_digest}|".encode())
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()[:32]
+
+
+def _project_salons(cities: dict, columns) -> None:
+    """Cut every city's salon records down to what load_salons(columns) returns."""
+    wanted = set((*CITY_COLUMNS, *columns))
+    for city in cities.values():
+        city["salons"] = [{k: v for k, v in s.items() if k in wanted} for s in city["salons"]]
+
+
+def _load_model(snapshot: Path) -> tuple[dict, dict] | None:
+    try:
+        with snapshot.open("rb") as fh:
+            cities, metros = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # noqa: BLE001 - a bad snapshot only costs a rebuild
+        print(f"  ! ignoring market model snapshot {snapshot.name}: {exc}")
+        return None
+    os.utime(snapshot)  # keep recently used snapshots out of the pruning
+    return cities, metros
+
+
+def _save_model(snapshot: Path, cities: dict, metros: dict) -> None:
+    try:
+        atomic_write.write_bytes(snapshot, pickle.dumps((cities, metros), protocol=pickle.HIGHEST_PROTOCOL))
+        old = sorted(snapshot.parent.glob("*.pickle"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in old[MODEL_CACHE_KEEP:]:
+            stale.unlink(missing_ok=True)
+    except OSError as exc:
+        print(f"  ! could not save market model snapshot: {exc}")
+
+
+def build_all(salons_path: Path = SALONS_FILE, columns=None, use_cache: bool = True) -> tuple[dict, dict]:
+    """Cities and metros. `columns` limits the salon fields loaded (see load_salons).
+
+    Reloaded from a snapshot under MODEL_CACHE_DIR when salons.json and this
+    module are unchanged since it was taken. The snapshot holds every salon
+    field, whatever `columns` the caller asked for, so one snapshot serves all
+    the build steps; the records are projected after loading.
+    """
+    key = _model_key(salons_path) if use_cache else None
+    snapshot = MODEL_CACHE_DIR / f"{key}.pickle" if key else None
+    model = _load_model(snapshot) if snapshot else None
+    if model is not None:
+        cities, metros = model
+    else:
+        salons = load_salons(salons_path, None if snapshot else columns)
+        cities = build_cities(salons)
+        metros = build_metros(cities)
+        if snapshot:
+            _save_model(snapshot, cities, metros)
+    if snapshot and columns is not None:
+        _project_salons(cities, columns)
     set_metro_index(metros)
     return cities, metros
 
 
+class CityIndex:
+    """Grid over the cities that have coordinates, for "closest cities to here".
+
+    Built once per cities dict; a query only measures the cities in the grid
+    cells that can hold anything within max_mi, so it does not grow with the
+    country. The longitude span widens with latitude, so nothing in range is
+    skipped.
+    """
+
+    def __init__(self, cities: dict[str, dict], cell_deg: float = 0.5):
+        self.cities = cities
+        self.cell_deg = cell_deg
+        self.order = {key: i for i, key in enumerate(cities)}
+        self.grid: dict[tuple[int, int], list[dict]] = {}
+        for city in cities.values():
+            if city["lat"] is not None:
+                cell = (int(city["lat"] // cell_deg), int(city["lng"] // cell_deg))
+                self.grid.setdefault(cell, []).append(city)
+
+    def within(self, lat: float, lng: float, max_mi: float) -> list[tuple[float, dict]]:
+        """(distance, city) for every city within max_mi of a point, unordered."""
+        cell_deg = self.cell_deg
+        span_y = int(max_mi / (69.0 * cell_deg)) + 1
+        edge_lat = min(89.0, abs(lat) + (span_y + 1) * cell_deg)
+        span_x = int(max_mi / (69.0 * math.cos(math.radians(edge_lat)) * cell_deg)) + 1
+        y, x = int(lat // cell_deg), int(lng // cell_deg)
+        found = []
+        for dy in range(-span_y, span_y + 1):
+            for dx in range(-span_x, span_x + 1):
+                for other in self.grid.get((y + dy, x + dx), ()):
+                    d = haversine_mi(lat, lng, other["lat"], other["lng"])
+                    if d <= max_mi:
+                        found.append((d, other))
+        return found
+
+    def nearest(self, city: dict, limit: int = 8, max_mi: float = 45.0) -> list[dict]:
+        """Closest other cities within max_mi, nearest first; ties keep cities-dict order."""
+        out = [
+            {"city": other, "distance_mi": round(d, 1)}
+            for d, other in self.within(city["lat"], city["lng"], max_mi)
+            if other["key"] != city["key"]
+        ]
+        out.sort(key=lambda r: (r["distance_mi"], self.order[r["city"]["key"]]))
+        return out[:limit]
+
+
+_CITY_INDEX: CityIndex | None = None
+
+
+def city_index(cities: dict[str, dict]) -> CityIndex:
+    """The CityIndex for `cities`, built on first use and reused while it is the same dict."""
+    global _CITY_INDEX
+    if _CITY_INDEX is None or _CITY_INDEX.cities is not cities or len(_CITY_INDEX.order) != len(cities):
+        _CITY_INDEX = CityIndex(cities)
+    return _CITY_INDEX
+
+
+# Reach of the "nearby cities" list on a city page. salon_changes.py rebuilds
+# every page within this reach of a changed city, since those pages list it.
+CITY_PAGE_NEARBY_MI = 40.0
+
+
 def nearest_cities(
     city: dict, cities: dict[str, dict], limit: int = 8, max_mi: float = 45.0
 ) -> list[dict]:
@@ -1320,16 +1632,7 @@ def nearest_cities(
         ]
         same_state.sort(key=lambda c: -c["salon_count"])
         return [{"city": c, "distance_mi": None} for c in same_state[:limit]]
-
-    out = []
-    for other in cities.values():
-        if other["key"] == city["key"] or other["lat"] is None:
-            continue
-        d = haversine_mi(city["lat"], city["lng"], other["lat"], other["lng"])
-        if d <= max_mi:
-            out.append({"city": other, "distance_mi": round(d, 1)})
-    out.sort(key=lambda r: r["distance_mi"])
-    return out[:limit]
+    return city_index(cities).nearest(city, limit, max_mi)
 
 
 def save_metros(cities: dict, metros: dict, path: Path = METROS_FILE) -> None:
@@ -1364,8 +1667,7 @@ def save_metros(cities: dict, metros: dict, path: Path = METROS_FILE) -> None:
             for k, c in sorted(cities.items())
         },
     }
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=1, ensure_ascii=False)
+    atomic_write.write_json(path, payload, indent=1, ensure_ascii=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+What changed between two salon snapshots, for builders that only redo the difference.
+
+fetch_salons.py diffs the data/salons.json it is about to replace against the
+new one and writes data/salon_changes.json:
+
+    {"generated_at": "...",
+     "from": "<fetched_at of the old snapshot>", "to": "<fetched_at of the new one>",
+     "added":   ["us/tx/frisco/123-main-st", ...],
+     "removed": [...],
+     "changed": {"us/il/schaumburg/1109-s-roselle-rd": ["hours", "phone"], ...},
+     "city_keys": ["IL/schaumburg", "TX/frisco", ...],
+     "metro_keys": ["TX/plano", ...],
+     "nearby_keys": ["TX/allen", ...],
+     "removed_pages": ["salons/tx/old-slug.html", ...]}
+
+city_keys are the markets.build_cities() keys of every city that gained, lost or
+changed a salon (both cities, when a salon's city changed). metro_keys are the
+metros of the new snapshot whose name or member cities differ from the old one:
+a salon opening in one city can move a neighbour to another metro without
+touching any salon there. nearby_keys are the other cities whose page can list
+a touched city among its nearby cities, before or after the change: every city
+within markets.CITY_PAGE_NEARBY_MI of one, plus the cities without coordinates
+in its state, whose page lists the state's biggest cities instead. removed_pages
+are city pages that no longer exist or were renamed, so a builder that skips
+the untouched cities can still delete the stale ones.
+`generate_local_pages.py --changed-only` consumes it.
+
+Usage:
+    python scripts/salon_changes.py OLD.json [NEW.json]    # diff two snapshots (NEW: data/salons.json)
+    git show HEAD~1:data/salons.json > /tmp/old.json && python scripts/salon_changes.py /tmp/old.json --write
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import atomic_write
+import markets
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SALONS_FILE = REPO_ROOT / "data" / "salons.json"
+CHANGES_FILE = REPO_ROOT / "data" / "salon_changes.json"
+
+
+def _page(city: dict) -> str:
+    return f"salons/{city['state'].lower()}/{city['slug']}.html"
+
+
+def _metro_view(metro: dict) -> tuple:
+    """What a city page shows of its metro."""
+    return metro["display_name"], sorted(metro["city_keys"])
+
+
+def _nearby_keys(touched: set[str], cities: dict[str, dict]) -> set[str]:
+    """Cities whose nearby-cities list can show one of `touched` (see markets.nearest_cities)."""
+    index = markets.CityIndex(cities)
+    states = set()
+    found: set[str] = set()
+    for key in touched:
+        city = cities.get(key)
+        if city is None:
+            continue
+        states.add(city["state"])
+        if city["lat"] is not None:
+            found.update(c["key"] for _, c in index.within(city["lat"], city["lng"], markets.CITY_PAGE_NEARBY_MI))
+    # A city without coordinates lists its state's biggest cities instead
+    found.update(k for k, c in cities.items() if c["lat"] is None and c["state"] in states)
+    return found
+
+
+def diff_salons(old: dict, new: dict) -> dict:
+    """Changeset between two salons.json payloads (see module docstring)."""
+    old_by_path = {s["path"]: s for s in old.get("salons", [])}
+    new_by_path = {s["path"]: s for s in new.get("salons", [])}
+
+    added = sorted(new_by_path.keys() - old_by_path.keys())
+    removed = sorted(old_by_path.keys() - new_by_path.keys())
+    changed: dict[str, list[str]] = {}
+    for path in sorted(old_by_path.keys() & new_by_path.keys()):
+        before, after = old_by_path[path], new_by_path[path]
+        fields = sorted(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+        if fields:
+            changed[path] = fields
+
+    touched: set[str] = set()
+    for path in (*added, *changed):
+        touched.add(markets.city_key(new_by_path[path]))
+    for path in (*removed, *changed):
+        touched.add(markets.city_key(old_by_path[path]))
+    touched.discard(None)
+
+    removed_pages: list[str] = []
+    metro_keys: list[str] = []
+    nearby: set[str] = set()
+    if touched:
+        old_cities = markets.build_cities(list(old_by_path.values()))
+        new_cities = markets.build_cities(list(new_by_path.values()))
+        removed_pages = sorted(
+            _page(city)
+            for key, city in old_cities.items()
+            if key in touched and (key not in new_cities or new_cities[key]["slug"] != city["slug"])
+        )
+        old_metros = {k: _metro_view(m) for k, m in markets.build_metros(old_cities).items()}
+        new_metros = {k: _metro_view(m) for k, m in markets.build_metros(new_cities).items()}
+        metro_keys = sorted(k for k, view in new_metros.items() if old_metros.get(k) != view)
+        for cities in (old_cities, new_cities):
+            nearby.update(_nearby_keys(touched, cities))
+        nearby.difference_update(touched)
+        nearby.intersection_update(new_cities)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "from": old.get("fetched_at"),
+        "to": new.get("fetched_at"),
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "city_keys": sorted(touched),
+        "metro_keys": metro_keys,
+        "nearby_keys": sorted(nearby),
+        "removed_pages": removed_pages,
+    }
+
+
+def write_changes(changes: dict, path: Path = CHANGES_FILE) -> bool:
+    # New timestamps over an identical changeset say nothing new
+    return atomic_write.write_json(
+        path, changes, volatile=("generated_at", "from", "to"), indent=1, ensure_ascii=False
+    )
+
+
+def load_changes(path: Path = CHANGES_FILE) -> dict | None:
+    try:
+        with path.open(encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def summary(changes: dict) -> str:
+    return (
+        f"{len(changes['added'])} added, {len(changes['removed'])} removed, "
+        f"{len(changes['changed'])} changed across {len(changes['city_keys'])} cities, "
+        f"{len(changes.get('metro_keys', []))} metros regrouped or renamed, "
+        f"{len(changes.get('nearby_keys', []))} nearby cities"
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("old", type=Path, help="the previous salons.json")
+    ap.add_argument("new", type=Path, nargs="?", default=SALONS_FILE, help="the current salons.json")
+    ap.add_argument("--write", action="store_true", help=f"write {CHANGES_FILE.relative_to(REPO_ROOT)}")
+    args = ap.parse_args()
+
+    with args.old.open(encoding="utf-8") as fh:
+        old = json.load(fh)
+    with args.new.open(encoding="utf-8") as fh:
+        new = json.load(fh)
+    changes = diff_salons(old, new)
+    print(summary(changes))
+    if args.write:
+        write_changes(changes)
+        print(f"Wrote {CHANGES_FILE.relative_to(REPO_ROOT)}")
+    else:
+        print(json.dumps({k: v for k, v in changes.items() if k != "generated_at"}, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Salon opening hours as numbers, for the page builders and for "open now" queries.
+
+data/salons.json keeps hours the way the pages print them ("9 AM - 7 PM" per
+day). Re-reading those strings for every salon on every build is wasted work -
+4,300 salons share only ~500 distinct weeks - so fetch_salons.py also writes
+data/salon_hours.json:
+
+    {"days": ["Monday", ..., "Sunday"],
+     "weeks": [[540, 1140, 540, 1140, ...], ...],
+     "salons": {"us/ak/anchorage/1142-n-muldoon-rd": 0, ...}}
+
+Each week is 14 numbers, opening and closing minute after midnight for Monday
+through Sunday, null for a day without hours. Salons point into "weeks" by
+index, so a builder can format each distinct week once.
+
+The file also records the sha256 of the salons.json it was built from. When
+data/salons.json has changed since, the table is ignored (with a warning) and
+hours are parsed from the salons' own labels, so stale hours never win.
+
+Usage:
+    python scripts/salon_hours.py            # rebuild data/salon_hours.json from data/salons.json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SALONS_FILE = REPO_ROOT / "data" / "salons.json"
+HOURS_FILE = REPO_ROOT / "data" / "salon_hours.json"
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+Week = tuple  # 14 x (int | None): open, close per day, Monday first
+
+_TABLE: dict[str, Week] | None = None
+
+
+# ---------------------------------------------------------------- parsing ---
+
+def parse_time(label: str) -> int | None:
+    """'8:30 AM' -> 510 minutes after midnight."""
+    label = label.strip()
+    suffix = label[-2:].upper()
+    if suffix not in ("AM", "PM"):
+        return None
+    hour, _, minute = label[:-2].strip().partition(":")
+    try:
+        hour_i = int(hour)
+    except ValueError:
+        return None
+    minute_i = int(minute) if minute.isdigit() else 0
+    if suffix == "PM" and hour_i != 12:
+        hour_i += 12
+    if suffix == "AM" and hour_i == 12:
+        hour_i = 0
+    return hour_i * 60 + minute_i
+
+
+def week_from_labels(hours: dict[str, str], partial: bool = False) -> Week | None:
+    """A salon's {"Monday": "9 AM - 7 PM", ...} as a Week; None if any day will not parse.
+
+    With partial=True a day that will not parse is left empty instead, for
+    callers that can use whatever days are readable.
+    """
+    week: list[int | None] = [None] * 14
+    for day, value in hours.items():
+        if day not in DAYS:
+            continue
+        opens, sep, closes = value.partition("-")
+        o, c = (parse_time(opens), parse_time(closes)) if sep else (None, None)
+        if o is None or c is None:
+            if partial:
+                continue
+            return None
+        i = DAYS.index(day) * 2
+        week[i], week[i + 1] = o, c
+    return tuple(week)
+
+
+# ------------------------------------------------------------- formatting ---
+
+def format_time(minutes: int) -> str:
+    """510 -> '8:30 AM', 1140 -> '7 PM' - the spelling data/salons.json uses."""
+    h, m = divmod(minutes, 60)
+    suffix = "AM" if h < 12 else "PM"
+    h12 = h % 12 or 12
+    return f"{h12}:{m:02d} {suffix}" if m else f"{h12} {suffix}"
+
+
+def hhmm(minutes: int) -> str:
+    """510 -> '08:30', for schema.org openingHoursSpecification."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def day_ranges(week: Week):
+    """(day, open, close) for each day that has hours, Monday first."""
+    for i, day in enumerate(DAYS):
+        o, c = week[2 * i], week[2 * i + 1]
+        if o is not None and c is not None:
+            yield day, o, c
+
+
+# ---------------------------------------------------------------- queries ---
+
+def is_open(week: Week, when: datetime) -> bool:
+    """Whether a salon with this week is open at local time `when`."""
+    minute = when.hour * 60 + when.minute
+    day = when.weekday()
+    o, c = week[2 * day], week[2 * day + 1]
+    if o is not None and c is not None and (o <= minute < c if o < c else minute >= o):
+        return True
+    # Yesterday's hours running past midnight
+    prev = (day - 1) % 7
+    o, c = week[2 * prev], week[2 * prev + 1]
+    return o is not None and c is not None and c < o and minute < c
+
+
+def open_until(week: Week, weekday: int, minute: int) -> bool:
+    """Whether the salon is still open at `minute` on `weekday` (0 = Monday) - "open late"."""
+    o, c = week[2 * weekday], week[2 * weekday + 1]
+    return o is not None and c is not None and (c < o or c >= minute)
+
+
+# ------------------------------------------------------------------ table ---
+
+def build_table(salons: list[dict]) -> dict:
+    """The data/salon_hours.json payload for these salons."""
+    weeks: dict[Week, int] = {}
+    by_path: dict[str, int] = {}
+    for salon in salons:
+        week = week_from_labels(salon.get("hours") or {})
+        if week is None or all(v is None for v in week):
+            continue
+        by_path[salon["path"]] = weeks.setdefault(week, len(weeks))
+    return {"days": list(DAYS), "weeks": [list(w) for w in weeks], "salons": by_path}
+
+
+def write_table(salons: list[dict], path: Path = HOURS_FILE, source_sha256: str | None = None) -> bool:
+    """Write data/salon_hours.json: one compact line per week and per salon.
+
+    `source_sha256` is the digest of the salons.json the salons came from.
+    """
+    table = build_table(salons)
+    lines = ["{", f' "source_sha256": {json.dumps(source_sha256)},']
+    lines += [f' "days": {json.dumps(table["days"])},', ' "weeks": [']
+    lines += [
+        f"  {json.dumps(w, separators=(',', ':'))}{',' if i + 1 < len(table['weeks']) else ''}"
+        for i, w in enumerate(table["weeks"])
+    ]
+    lines += [" ],", ' "salons": {']
+    items = sorted(table["salons"].items())
+    lines += [
+        f"  {json.dumps(p)}: {i}{',' if n + 1 < len(items) else ''}"
+        for n, (p, i) in enumerate(items)
+    ]
+    lines += [" }", "}"]
+    return atomic_write.write_text(path, "\n".join(lines) + "\n")
+
+
+def load_table(path: Path = HOURS_FILE, salons_path: Path = SALONS_FILE) -> dict[str, Week]:
+    """Salon path -> Week. Empty if the file is missing or older than `salons_path`."""
+    try:
+        with path.open(encoding="utf-8") as fh:
+            table = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if table.get("source_sha256") != atomic_write.file_digest(salons_path):
+        print(
+            f"  ! {path.name} was not built from the current {salons_path.name}; "
+            "reading hours from the salon records (run scripts/salon_hours.py)"
+        )
+        return {}
+    weeks = [tuple(w) for w in table.get("weeks", [])]
+    return {p: weeks[i] for p, i in table.get("salons", {}).items()}
+
+
+def week_for(salon: dict) -> Week | None:
+    """The salon's Week from data/salon_hours.json, else parsed from its labels.
+
+    None when it has no hours, or hours that do not parse.
+    """
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = load_table()
+    week = _TABLE.get(salon.get("path", ""))
+    if week is None and salon.get("hours"):
+        week = week_from_labels(salon["hours"])
+    return week
+
+
+def main() -> int:
+    raw = SALONS_FILE.read_bytes()
+    written = write_table(json.loads(raw)["salons"], source_sha256=hashlib.sha256(raw).hexdigest())
+    print(f"{'Wrote' if written else 'Unchanged:'} {HOURS_FILE.relative_to(REPO_ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Columnar copy of data/salons.json that build steps can load in a few ms.
+
+data/salons.json is ~90k lines of indented JSON, and every step that calls
+markets.build_all() used to parse all of it just to group salons by city. The
+same records are written next to it as data/salons.columns:
+
+    magic | header length | JSON header | column blobs
+
+one blob per field. Floats (lat/lng) are a packed array of doubles, NaN for
+null. Strings are dictionary-encoded: the distinct values once, joined by NUL,
+plus an array of indexes - 51 states and ~2,200 cities instead of 4,300 of each.
+Anything else (hours) is dictionary-encoded JSON, decoded once per distinct
+value. A loader asks for the columns it needs and never touches the rest.
+
+The header records the sha256 of the salons.json it was built from; a loader
+finding a different salons.json ignores the columns file and falls back to the
+JSON, so a stale copy can never be read.
+
+Usage:
+    python scripts/salon_store.py            # rebuild data/salons.columns
+    python scripts/salon_store.py --check    # verify it matches data/salons.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SALONS_FILE = REPO_ROOT / "data" / "salons.json"
+
+MAGIC = b"GCSALONS"
+FORMAT_VERSION = 1
+_HEADER_LEN = struct.Struct("<I")
+
+
+def columns_path(salons_path: Path = SALONS_FILE) -> Path:
+    return salons_path.with_suffix(".columns")
+
+
+# ------------------------------------------------------------------ write ---
+
+def _index_array(indexes: list[int], size: int) -> array:
+    return array("H" if size <= 0xFFFF else "I", indexes)
+
+
+def _encode_column(values: list) -> tuple[dict, list[bytes]]:
+    """Pick an encoding for one field. Returns (header entry, blobs)."""
+    if all(v is None or type(v) is float for v in values):
+        packed = array("d", (math.nan if v is None else v for v in values))
+        return {"kind": "float"}, [packed.tobytes()]
+
+    if all(v is None or type(v) is str for v in values):
+        if any("\0" in v for v in values if v is not None):
+            raise ValueError("string column contains NUL")
+        kind = "str"
+    else:
+        values = [json.dumps(v, ensure_ascii=False, separators=(",", ":")) for v in values]
+        kind = "json"
+
+    # None (strings only) is the index one past the last distinct value
+    distinct: dict[str, int] = {}
+    for v in values:
+        if v is not None:
+            distinct.setdefault(v, len(distinct))
+    null_index = len(distinct)
+    indexes = [null_index if v is None else distinct[v] for v in values]
+    packed = _index_array(indexes, null_index + 1)
+    return (
+        {"kind": kind, "distinct": len(distinct), "index_type": packed.typecode},
+        ["\0".join(distinct).encode("utf-8"), packed.tobytes()],
+    )
+
+
+def encode(payload: dict, source_sha256: str) -> bytes:
+    """salons.json payload -> columns file bytes."""
+    salons = payload["salons"]
+    fields = list(salons[0]) if salons else []
+    for salon in salons:
+        if list(salon) != fields:
+            raise ValueError(f"salon {salon.get('path')!r} does not have the fields {fields}")
+
+    columns = {}
+    blobs: list[bytes] = []
+    offset = 0
+    for field in fields:
+        entry, parts = _encode_column([s[field] for s in salons])
+        entry["blobs"] = []
+        for part in parts:
+            entry["blobs"].append([offset, len(part)])
+            blobs.append(part)
+            offset += len(part)
+        columns[field] = entry
+
+    header = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "source_sha256": source_sha256,
+        "count": len(salons),
+        "meta": {k: v for k, v in payload.items() if k != "salons"},
+        "fields": fields,
+        "columns": columns,
+    }
+    raw_header = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return MAGIC + _HEADER_LEN.pack(len(raw_header)) + raw_header + b"".join(blobs)
+
+
+def build(salons_path: Path = SALONS_FILE) -> bool:
+    """(Re)write the columns file next to `salons_path`. True if it changed."""
+    raw = salons_path.read_bytes()
+    data = encode(json.loads(raw), hashlib.sha256(raw).hexdigest())
+    return atomic_write.write_bytes(columns_path(salons_path), data)
+
+
+# ------------------------------------------------------------------- read ---
+
+class SalonTable:
+    """A decoded columns file. Columns are decoded on first use."""
+
+    def __init__(self, data: bytes):
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a salon columns file")
+        start = len(MAGIC) + _HEADER_LEN.size
+        (header_len,) = _HEADER_LEN.unpack_from(data, len(MAGIC))
+        header = json.loads(data[start : start + header_len])
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported salon columns version {header.get('version')}")
+        self._data = memoryview(data)[start + header_len :]
+        self._decoded: dict[str, list] = {}
+        self._swap = header.get("byteorder", "little") != sys.byteorder
+        self.header = header
+        self.count: int = header["count"]
+        self.fields: list[str] = header["fields"]
+        self.meta: dict = header["meta"]
+        self.source_sha256: str = header["source_sha256"]
+
+    def _blob(self, offset: int, size: int) -> memoryview:
+        return self._data[offset : offset + size]
+
+    def column(self, field: str) -> list:
+        """Every salon's value for `field`, in file order."""
+        if field in self._decoded:
+            return self._decoded[field]
+        entry = self.header["columns"][field]
+        kind = entry["kind"]
+        if kind == "float":
+            packed = array("d")
+            packed.frombytes(self._blob(*entry["blobs"][0]))
+            if self._swap:
+                packed.byteswap()
+            values = [None if v != v else v for v in packed]
+        else:
+            table_blob, index_blob = (self._blob(*b) for b in entry["blobs"])
+            table = bytes(table_blob).decode("utf-8").split("\0") if entry["distinct"] else []
+            if kind == "json":
+                table = [json.loads(v) for v in table]
+            table.append(None)  # null_index
+            indexes = array(entry["index_type"])
+            indexes.frombytes(index_blob)
+            if self._swap:
+                indexes.byteswap()
+            if kind == "json":
+                # Mutable values get their own copy per salon
+                values = [_copy(table[i]) for i in indexes]
+            else:
+                values = [table[i] for i in indexes]
+        self._decoded[field] = values
+        return values
+
+    def records(self, columns: tuple[str, ...] | list[str] | None = None) -> list[dict]:
+        """Salon dicts holding `columns` (default: every field), in file order."""
+        wanted = [f for f in self.fields if columns is None or f in columns]
+        decoded = [self.column(f) for f in wanted]
+        return [dict(zip(wanted, row)) for row in zip(*decoded)] if wanted else [{} for _ in range(self.count)]
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def read(salons_path: Path = SALONS_FILE) -> SalonTable | None:
+    """The columns file for `salons_path`, or None if missing, unreadable or stale."""
+    try:
+        table = SalonTable(columns_path(salons_path).read_bytes())
+    except (OSError, ValueError, KeyError):
+        return None
+    if table.source_sha256 != atomic_write.file_digest(salons_path):
+        return None
+    return table
+
+
+def load(salons_path: Path = SALONS_FILE, columns=None) -> list[dict] | None:
+    """Salon records projected to `columns`, or None when the JSON must be read instead."""
+    table = read(salons_path)
+    return table.records(columns) if table is not None else None
+
+
+def check(salons_path: Path = SALONS_FILE) -> list[str]:
+    """Differences between the columns file and salons.json (empty when they agree)."""
+    table = read(salons_path)
+    if table is None:
+        return [f"{columns_path(salons_path).name} is missing or stale"]
+    with salons_path.open(encoding="utf-8") as fh:
+        payload = json.load(fh)
+    problems = []
+    if table.meta != {k: v for k, v in payload.items() if k != "salons"}:
+        problems.append("header fields differ")
+    expected = payload["salons"]
+    if table.count != len(expected):
+        problems.append(f"{table.count} salons in the columns file, {len(expected)} in the JSON")
+    for got, want in zip(table.records(), expected):
+        if got != want or list(got) != list(want):
+            problems.append(f"{want.get('path')}: {got} != {want}")
+    return problems
+
+
+# ------------------------------------------------------------------- main ---
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--check", action="store_true", help="verify instead of rebuilding")
+    args = ap.parse_args()
+
+    out = columns_path(SALONS_FILE).relative_to(REPO_ROOT)
+    if args.check:
+        problems = check()
+        for problem in problems[:20]:
+            print(f"  ! {problem}")
+        if problems:
+            print(f"{out} does not match data/salons.json ({len(problems)} problem(s))")
+            return 1
+        print(f"{out} matches data/salons.json")
+        return 0
+
+    print(f"{'Wrote' if build() else 'Unchanged:'} {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())